@@ -0,0 +1,122 @@
+"""
+Micro-benchmark of operations on utils.Vector and utils.Point compared to
+their original list-based implementation, which is reproduced below.
+
+Usage (from the top directory of the repository):
+
+    python -m aoc.bench_vector [-n NUMBER]
+"""
+
+import sys
+import timeit
+import argparse
+import functools
+from typing import List, Union, Callable, Iterable
+
+from .utils import Vector, Point
+
+
+class ListVector(object):
+    """Original implementation of Vector, for comparison only"""
+
+    def __init__(self, values: Iterable = None):
+        self.values = list(values or [])
+
+    def __hash__(self):
+        return hash(tuple(self.values))
+
+    def __add__(self, other: Union["ListVector", Iterable]) -> "ListVector":
+        return self.pairwise(other, lambda a, b: a+b)
+
+    def __sub__(self, other: Union["ListVector", Iterable]) -> "ListVector":
+        return self.pairwise(other, lambda a, b: a-b)
+
+    def pairwise(self, other, func: Callable) -> "ListVector":
+        assert len(self) == len(other), (
+            f"Length mismatch: {len(self)} vs. {len(other)}"
+        )
+        values = [functools.reduce(func, pair) for pair in zip(self, other)]
+        return self.__class__(values)
+
+    def __abs__(self):
+        return self.__class__(abs(v) for v in self)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __getitem__(self, idx: int):
+        return self.values[idx]
+
+    def __eq__(self, other: "ListVector"):
+        return tuple(self.values) == tuple(other)
+
+
+class ListPoint(ListVector):
+    """Original implementation of Point, for comparison only"""
+
+    def __init__(self, *coords: Union[int, List[int]]):
+        if isinstance(coords[0], (list, tuple, type(self))):
+            super().__init__(*coords)
+        else:
+            super().__init__(coords)
+
+    @property
+    def x(self):
+        return self[0]
+
+    @property
+    def y(self):
+        return self[1]
+
+    def l1_dist(self, other: 'ListPoint') -> int:
+        return sum(*abs(self - other))
+
+
+# operation name -> statement; `a` and `b` are points, `t` is a tuple
+OPERATIONS = {
+    "create": "P(3, 4)",
+    "a + b": "a + b",
+    "a + tuple": "a + t",
+    "a - b": "a - b",
+    "hash(a)": "hash(a)",
+    "a == b": "a == b",
+    "a.x": "a.x",
+    "abs(a)": "abs(a)",
+    "l1_dist": "a.l1_dist(b)",
+    "in set": "a in s",
+}
+
+
+def measure(cls: type, stmt: str, number: int) -> float:
+    """Time `stmt` on points of class `cls`. Return the best time per
+    operation in nanoseconds (from 5 repetitions)."""
+    env = {"P": cls, "a": cls(3, 4), "b": cls(-1, 7), "t": (1, 1)}
+    env["s"] = {cls(i, i) for i in range(100)}
+    times = timeit.repeat(stmt, globals=env, number=number, repeat=5)
+    return min(times) / number * 1e9
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare Point operations to the list-based version")
+    parser.add_argument("-n", "--number", type=int, default=100000,
+                        help="number of executions of each operation")
+    args = parser.parse_args(argv)
+
+    rows = [("Operation", "list-based", "tuple-based", "speedup")]
+    for name, stmt in OPERATIONS.items():
+        old = measure(ListPoint, stmt, args.number)
+        new = measure(Point, stmt, args.number)
+        rows.append((name, "{:.0f} ns".format(old), "{:.0f} ns".format(new),
+                     "x{:.1f}".format(old / new)))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(val.ljust(w) for val, w in zip(row, widths)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,386 @@
+"""
+Benchmark solutions: time parsing of the input and solving of every part
+separately, with warmup and repeated runs, and report min/median/p95.
+
+Usage (from the top directory of the repository):
+
+    python -m aoc.benchmark                       # all days, real inputs
+    python -m aoc.benchmark 08 12 -p 1 -n 20      # selected days and parts
+    python -m aoc.benchmark -o new.json           # save results as JSON
+    python -m aoc.benchmark --compare old.json    # flag regressions
+    python -m aoc.benchmark 08 -s 10 100 1000     # synthetic inputs
+
+Each measured run receives a freshly parsed input (see utils.isolated())
+that is prepared outside of the timed region. Garbage collection is
+disabled while timing, the same way module timeit does it.
+
+When comparing against previous results, a (day, part) is reported as
+a regression if its median solve time grew by more than the threshold
+(10% by default) and also exceeds the p95 of the previous solve times.
+Results with fewer than MIN_RUNS measured runs (on either side) are never
+flagged, as their medians are too noisy. The exit code is 1 if there are
+regressions.
+
+With --scale, solutions are run on synthetic inputs of given sizes (see
+aoc.generators) and a summary of how the solve time grows with the size
+is printed.
+"""
+
+import os
+import gc
+import sys
+import json
+import hashlib
+import time
+import math
+import platform
+import collections.abc
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+from typing import List, Dict, Tuple, Callable, Any, Optional
+
+from . import utils, generators
+from .runner import discover, load_solution, fmt_time
+
+DEFAULTS = {
+    "warmup": 1,
+    "repeat": 10,
+    "budget": 10.0,  # seconds per day and part
+}
+
+# minimum number of measured runs to flag regressions and improvements
+MIN_RUNS = 5
+
+
+def timed(func: Callable, *args) -> Tuple[Any, int]:
+    """Run `func(*args)` once and return its result and the elapsed time
+    in nanoseconds."""
+    gcold = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        res = func(*args)
+        end = time.perf_counter_ns()
+    finally:
+        if gcold:
+            gc.enable()
+    return res, end - start
+
+
+def percentile(values: List[int], pct: float) -> int:
+    """Compute percentile `pct` (0-100) of `values` by nearest rank method"""
+    values = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank-1]
+
+
+def stats(timings: List[int]) -> Dict[str, Any]:
+    """Summarize timings (in nanoseconds)"""
+    return {
+        "n": len(timings),
+        "min": min(timings),
+        "median": int(statistics.median(timings)),
+        "p95": percentile(timings, 95),
+        "mean": int(statistics.fmean(timings)),
+        "stdev": int(statistics.stdev(timings)) if len(timings) > 1 else 0,
+    }
+
+
+def bench(
+    solve: Callable,
+    inp: Any,
+    warmup: int = DEFAULTS["warmup"],
+    repeat: int = DEFAULTS["repeat"],
+    budget: float = DEFAULTS["budget"]
+) -> Dict[str, Any]:
+    """Benchmark solver `solve` on input `inp` (typically an Input).
+
+    There are `warmup` unmeasured runs followed by up to `repeat` measured
+    ones. Repetition stops earlier if the time `budget` (seconds) has been
+    used up, but there is always at least one measured run.
+    Parsing (obtaining the input via prepare()) and solving are timed
+    separately.
+    """
+    deadline = time.perf_counter() + budget
+    for _ in range(warmup):
+        solve(prepare(inp))
+        if time.perf_counter() > deadline:
+            break
+
+    parse_times, solve_times = [], []
+    answer = None
+    while len(solve_times) < repeat:
+        data, elapsed = timed(prepare, inp)
+        parse_times.append(elapsed)
+        answer, elapsed = timed(solve, data)
+        solve_times.append(elapsed)
+        if time.perf_counter() > deadline:
+            break
+
+    return {
+        "answer": str(answer),
+        "parse": stats(parse_times),
+        "solve": stats(solve_times),
+    }
+
+
+def prepare(inp: Any) -> Any:
+    """Obtain a fresh input for a solver via utils.isolated(). Streamed
+    inputs (iterators) are consumed into a list here, otherwise reading
+    and parsing of the file would be counted as solve time."""
+    data = utils.isolated(inp)
+    if isinstance(data, collections.abc.Iterator):
+        data = list(data)
+    return data
+
+
+def bench_day(
+    day: str,
+    path: str,
+    parts: List[int],
+    sizes: Optional[List[int]] = None,
+    seed: int = 0,
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """Benchmark given parts of the solution of the day `day`.
+
+    By default, the real input is used. If `sizes` are given, the solution
+    is instead run on synthetic inputs of these sizes, created with
+    aoc.generators. Returns a record per part and input, see bench().
+    """
+    records = []
+    cwd = os.getcwd()
+    # inputs are specified relative to the directory of the solution
+    os.chdir(os.path.dirname(path))
+    try:
+        module = load_solution(path)
+        if sizes:
+            # a descriptor of real input (or of a test) serves as a template
+            # that tells how to parse synthetic inputs.
+            cases = module.reals or module.tests
+            inputs = [
+                ("synthetic:{}".format(size),
+                 with_file(cases[0][0], synthetic_input(day, size, seed)))
+                for size in sizes
+            ]
+        elif module.reals:
+            inputs = [("input.txt", module.reals[0][0])]
+        else:
+            inputs = []
+        for name, inp in inputs:
+            for part in parts:
+                record = {"day": day, "part": part, "input": name}
+                try:
+                    record.update(bench(getattr(module, f"solve_p{part}"),
+                                        inp, **kwargs))
+                except Exception as ex:
+                    record["error"] = "{}: {}".format(type(ex).__name__, ex)
+                records.append(record)
+    finally:
+        os.chdir(cwd)
+    return records
+
+
+def synthetic_input(day: str, size: int, seed: int = 0) -> str:
+    """Generate synthetic input for the day `day` and return the path to
+    the file where it was saved. Files are reused by later calls, as long
+    as the source of aoc.generators does not change: its hash is a part of
+    the file name."""
+    with open(generators.__file__, "rb") as fd:
+        version = hashlib.sha1(fd.read()).hexdigest()[:8]
+    fpath = os.path.join(
+        tempfile.gettempdir(),
+        f"aoc-2022-day{day}-size{size}-seed{seed}-{version}.txt")
+    if not os.path.exists(fpath):
+        generators.write(day, size, fpath, seed)
+    return fpath
+
+
+def with_file(inp: Any, fpath: str) -> Any:
+    """Make a copy of input descriptor(s) in `inp` that reads the file
+    `fpath` in place of the original file."""
+    if isinstance(inp, utils.Input):
+        return utils.Input(fpath, **inp.kwargs)
+    if isinstance(inp, tuple):
+        return tuple(with_file(item, fpath) for item in inp)
+    return inp
+
+
+def key(record: Dict[str, Any]) -> tuple:
+    return (record["day"], record["part"], record["input"])
+
+
+def compare(
+    records: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    threshold: float = 0.1
+) -> Dict[tuple, Tuple[float, str]]:
+    """Compare median solve times of `records` to `baseline` and return
+    the ratios new/old and verdicts by (day, part, input).
+
+    The verdict is "REGRESSION" if the ratio exceeds 1 + `threshold` and
+    the new median is above the p95 of the baseline, "improved" if the
+    ratio is below 1 - `threshold` and the new p95 is below the median of
+    the baseline, "few runs" if either side has less than MIN_RUNS runs,
+    and empty otherwise.
+    """
+    old = {key(rec): rec for rec in baseline if "solve" in rec}
+    ratios = {}
+    for rec in records:
+        if "solve" not in rec or key(rec) not in old:
+            continue
+        new, base = rec["solve"], old[key(rec)]["solve"]
+        ratio = new["median"] / max(1, base["median"])
+        if min(new["n"], base["n"]) < MIN_RUNS:
+            verdict = "few runs"
+        elif ratio > 1 + threshold and new["median"] > base["p95"]:
+            verdict = "REGRESSION"
+        elif ratio < 1 - threshold and new["p95"] < base["median"]:
+            verdict = "improved"
+        else:
+            verdict = ""
+        ratios[key(rec)] = (ratio, verdict)
+    return ratios
+
+
+def scaling(records: List[Dict[str, Any]]) -> str:
+    """Summarize how median solve time grows with the size of synthetic
+    input. Growth exponent k between two consecutive sizes means that
+    time is proportional to size**k."""
+    series = {}
+    for rec in records:
+        if "solve" in rec and rec["input"].startswith("synthetic:"):
+            size = int(rec["input"].split(":")[1])
+            series.setdefault((rec["day"], rec["part"]), []).append(
+                (size, rec["solve"]["median"]))
+    lines = []
+    for (day, part), points in sorted(series.items()):
+        points.sort()
+        steps = [fmt_ns(points[0][1]) + f" @ {points[0][0]}"]
+        for (s1, t1), (s2, t2) in zip(points, points[1:]):
+            k = math.log(max(t2, 1) / max(t1, 1)) / math.log(s2 / s1)
+            steps.append("{} @ {} (k={:.2f})".format(fmt_ns(t2), s2, k))
+        lines.append("Day {} p.{}: {}".format(day, part, ", ".join(steps)))
+    return "\n".join(lines)
+
+
+def fmt_ns(ns: int) -> str:
+    return fmt_time(ns / 1e9)
+
+
+def report(
+    records: List[Dict[str, Any]],
+    ratios: Optional[Dict[tuple, Tuple[float, str]]] = None
+) -> str:
+    """Format benchmark records (and optionally comparison) as a table"""
+    header = ["Day", "Part", "Input", "Runs", "Parse med",
+              "Solve min", "Solve med", "Solve p95"]
+    if ratios is not None:
+        header += ["vs base", ""]
+    rows, errors = [header], []
+    for rec in records:
+        if "error" in rec:
+            rows.append([rec["day"], str(rec["part"]), rec["input"], "ERROR"])
+            errors.append("Day {} p.{}: {}".format(
+                rec["day"], rec["part"], rec["error"]))
+            continue
+        row = [rec["day"], str(rec["part"]), rec["input"],
+               str(rec["solve"]["n"]), fmt_ns(rec["parse"]["median"]),
+               fmt_ns(rec["solve"]["min"]), fmt_ns(rec["solve"]["median"]),
+               fmt_ns(rec["solve"]["p95"])]
+        if ratios is not None:
+            if key(rec) not in ratios:
+                row += ["-", "new"]
+            else:
+                ratio, verdict = ratios[key(rec)]
+                row += ["x{:.2f}".format(ratio), verdict]
+        rows.append(row)
+    widths = [max(len(row[i]) for row in rows if i < len(row))
+              for i in range(len(header))]
+    lines = ["  ".join(val.ljust(w) for val, w in zip(row, widths)).rstrip()
+             for row in rows]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    if errors:
+        lines += [""] + errors
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark solutions of selected days")
+    parser.add_argument("days", nargs="*",
+                        help="days to benchmark, e.g. 01 7 (default: all)")
+    parser.add_argument("-p", "--parts", nargs="+", type=int,
+                        choices=[1, 2], default=[1, 2])
+    parser.add_argument("-w", "--warmup", type=int,
+                        default=DEFAULTS["warmup"])
+    parser.add_argument("-n", "--repeat", type=int,
+                        default=DEFAULTS["repeat"])
+    parser.add_argument("-b", "--budget", type=float,
+                        default=DEFAULTS["budget"],
+                        help="max seconds to spend on a day and part")
+    parser.add_argument("-o", "--output", help="save results to JSON file")
+    parser.add_argument("-c", "--compare",
+                        help="JSON file with results of a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown considered a regression")
+    parser.add_argument("-s", "--scale", nargs="+", type=int,
+                        help="run on synthetic inputs of these sizes "
+                             "instead of the real input")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed for synthetic inputs")
+    args = parser.parse_args(argv)
+
+    solutions = discover()
+    if args.scale:
+        solutions = {day: path for day, path in solutions.items()
+                     if day in generators.GENERATORS}
+    if args.days:
+        days = sorted(set(day.zfill(2) for day in args.days))
+        unknown = [day for day in days if day not in solutions]
+        if unknown:
+            parser.error("no solution for day(s): {}".format(", ".join(unknown)))
+        solutions = {day: solutions[day] for day in days}
+
+    options = {"warmup": args.warmup, "repeat": args.repeat,
+               "budget": args.budget}
+    records = []
+    for day, path in solutions.items():
+        try:
+            records.extend(bench_day(day, path, sorted(set(args.parts)),
+                                     args.scale, args.seed, **options))
+        except Exception as ex:
+            print(f"Day {day}: {type(ex).__name__}: {ex}", file=sys.stderr)
+
+    ratios = None
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)["results"]
+        ratios = compare(records, baseline, args.threshold)
+
+    print(report(records, ratios))
+    if args.scale:
+        print("\n" + scaling(records))
+
+    if args.output:
+        results = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                **options,
+            },
+            "results": records,
+        }
+        with open(args.output, "w") as fd:
+            json.dump(results, fd, indent=2)
+
+    regressions = [k for k, (_, verdict) in (ratios or {}).items()
+                   if verdict == "REGRESSION"]
+    return int(bool(regressions))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,374 @@
+"""
+Generators of synthetic puzzle inputs of arbitrary size, for stress testing
+the solutions and measuring how they scale (see aoc.benchmark --scale).
+
+Every generator takes the `size` of the input and a random number generator
+and returns a list of lines in the format of the input of the given day.
+The meaning of `size` depends on the day, see the docstring of each function.
+
+Usage (from the top directory of the repository):
+
+    python -m aoc.generators 08 1000 -s 42 -o /tmp/trees.txt
+"""
+
+import sys
+import random
+import string
+import argparse
+from typing import List, Dict, Callable, Tuple, Optional
+
+
+def gen_01(size: int, rng: random.Random) -> List[str]:
+    """Calories carried by `size` elves"""
+    lines = []
+    for _ in range(size):
+        if lines:
+            lines.append("")
+        lines.extend(str(rng.randint(1000, 70000))
+                     for _ in range(rng.randint(1, 15)))
+    return lines
+
+
+def gen_04(size: int, rng: random.Random) -> List[str]:
+    """`size` pairs of section assignments"""
+    lines = []
+    for _ in range(size):
+        pairs = []
+        for _ in range(2):
+            start = rng.randint(1, 99)
+            pairs.append("{}-{}".format(start, rng.randint(start, 99)))
+        lines.append(",".join(pairs))
+    return lines
+
+
+def gen_06(size: int, rng: random.Random) -> List[str]:
+    """Datastream of length `size` (at least 14)"""
+    size = max(size, 14)
+    letters = string.ascii_lowercase
+    # only 4 distinct letters before the marker, then 14 distinct ones
+    stream = [rng.choice(letters[:4]) for _ in range(size - 14)]
+    stream += rng.sample(letters, 14)
+    return ["".join(stream)]
+
+
+def gen_08(size: int, rng: random.Random) -> List[str]:
+    """A square forest of `size` x `size` trees"""
+    return ["".join(rng.choice(string.digits) for _ in range(size))
+            for _ in range(size)]
+
+
+def gen_09(size: int, rng: random.Random) -> List[str]:
+    """`size` moves of the rope head, 1 to 20 steps each"""
+    return ["{} {}".format(rng.choice("RLUD"), rng.randint(1, 20))
+            for _ in range(size)]
+
+
+def gen_10(size: int, rng: random.Random) -> List[str]:
+    """A program of `size` instructions"""
+    lines = []
+    for _ in range(size):
+        if rng.random() < 0.3:
+            lines.append("noop")
+        else:
+            lines.append("addx {}".format(rng.randint(-20, 20)))
+    return lines
+
+
+def gen_11(size: int, rng: random.Random) -> List[str]:
+    """Notes about `size` (at least 3) monkeys.
+    As in real inputs, exactly one monkey squares the worry level. No
+    monkey throws items to it, so that every item is squared at most once
+    and worry levels (not reduced in part 1) do not grow exponentially.
+    """
+    size = max(size, 3)
+    divisors = primes(size)
+    squaring = rng.randrange(size)
+    lines = []
+    for idx in range(size):
+        items = [str(rng.randint(50, 99)) for _ in range(rng.randint(1, 8))]
+        if idx == squaring:
+            operation = "old * old"
+        elif rng.random() < 0.375:
+            operation = "old * {}".format(rng.randint(2, 19))
+        else:
+            operation = "old + {}".format(rng.randint(1, 8))
+        others = [i for i in range(size) if i not in (idx, squaring)]
+        if lines:
+            lines.append("")
+        lines += [
+            f"Monkey {idx}:",
+            "  Starting items: {}".format(", ".join(items)),
+            f"  Operation: new = {operation}",
+            f"  Test: divisible by {divisors[idx]}",
+            f"    If true: throw to monkey {rng.choice(others)}",
+            f"    If false: throw to monkey {rng.choice(others)}",
+        ]
+    return lines
+
+
+def gen_12(size: int, rng: random.Random) -> List[str]:
+    """Heightmap `size` (at least 24) columns wide and size/4 (at least 5)
+    rows high.
+    Elevation grows from `S` in the top left corner to `E` in the bottom
+    right corner by at most one per step. Some positions are randomly
+    lowered to create obstacles, except in the top row and the rightmost
+    column, so that `E` is always reachable.
+    """
+    # at least 25 steps are necessary to climb from `a` to `z`
+    n_cols, n_rows = max(size, 24), max(size // 4, 5)
+    n_steps = n_rows + n_cols - 2
+    lines = []
+    for r in range(n_rows):
+        row = []
+        for c in range(n_cols):
+            elev = (r + c) * 25 // n_steps
+            if r > 0 and c < n_cols - 1 and rng.random() < 0.2:
+                elev = rng.randint(0, elev)
+            row.append(chr(ord("a") + elev))
+        lines.append(row)
+    lines[0][0] = "S"
+    lines[-1][-1] = "E"
+    return ["".join(row) for row in lines]
+
+
+def gen_15(size: int, rng: random.Random, max_xy: int = 4000000) -> List[str]:
+    """`size` (at least 4) sensors and their beacons in the area [0, max_xy]
+    (max_xy at least 1).
+    The reach of every sensor stops just short of one random position,
+    which is therefore not covered by any sensor. All other positions of
+    the area are covered by the first 4 sensors: each of them lies on a
+    diagonal from the uncovered position, far enough to cover the whole
+    quadrant of the area in its direction.
+    """
+    dx, dy = rng.randint(0, max_xy), rng.randint(0, max_xy)
+    lines = []
+    for sign_x, sign_y in ((-1, -1), (-1, 1), (1, -1), (1, 1)):
+        # sensor at (dx + sign_x * a, dy + sign_y * a) with reach 2a - 1
+        # covers all (x, y) != (dx, dy) with x - dx and y - dy in [-a, 0]
+        # (or [0, a], by the signs)
+        a = rng.randint(max(max_xy, 1), 2 * max(max_xy, 1))
+        sx, sy = dx + sign_x * a, dy + sign_y * a
+        bx, by = sx - sign_x * (2 * a - 1), sy
+        lines.append(f"Sensor at x={sx}, y={sy}: "
+                     f"closest beacon is at x={bx}, y={by}")
+    for _ in range(size - 4):
+        # a sensor closer than 2 positions would cover (dx, dy), draw again
+        reach = 0
+        while reach < 1:
+            sx, sy = rng.randint(0, max_xy), rng.randint(0, max_xy)
+            reach = abs(sx - dx) + abs(sy - dy) - 1
+        ox = rng.randint(0, reach)
+        bx = sx + rng.choice((-1, 1)) * ox
+        by = sy + rng.choice((-1, 1)) * (reach - ox)
+        lines.append(f"Sensor at x={sx}, y={sy}: "
+                     f"closest beacon is at x={bx}, y={by}")
+    return lines
+
+
+# max number of valves with positive flow rate in gen_16()
+MAX_FLOWING = 15
+
+
+def gen_16(size: int, rng: random.Random) -> List[str]:
+    """Graph of `size` valves, a quarter of them (but at most MAX_FLOWING,
+    as in real inputs) with positive flow rate. Larger sizes therefore add
+    rooms to pass through, the number of valves worth opening (which the
+    solvers are exponential in) stays the same.
+    Valves are connected by a random spanning tree and a few more tunnels.
+    The first valve is AA and its flow rate is zero.
+    """
+    size = max(size, 2)
+    width = max(2, len(to_letters(size - 1)))
+    names = [to_letters(i).rjust(width, "A") for i in range(size)]
+    tunnels = {name: set() for name in names}
+
+    def connect(a, b):
+        tunnels[a].add(b)
+        tunnels[b].add(a)
+
+    for idx in range(1, size):
+        connect(names[idx], names[rng.randrange(idx)])
+    for _ in range(size // 2):
+        a, b = rng.sample(names, 2)
+        connect(a, b)
+
+    flowing = set(rng.sample(names[1:], min(MAX_FLOWING, max(1, size // 4))))
+    lines = []
+    for name in names:
+        rate = rng.randint(1, 25) if name in flowing else 0
+        trgs = sorted(tunnels[name])
+        if len(trgs) == 1:
+            text = "tunnel leads to valve"
+        else:
+            text = "tunnels lead to valves"
+        lines.append("Valve {} has flow rate={}; {} {}".format(
+            name, rate, text, ", ".join(trgs)))
+    return lines
+
+
+def gen_17(size: int, rng: random.Random) -> List[str]:
+    """Jet pattern of length `size` (at least 2)"""
+    pattern = ["<", ">"] + [rng.choice("<>") for _ in range(size - 2)]
+    rng.shuffle(pattern)
+    return ["".join(pattern)]
+
+
+def gen_18(size: int, rng: random.Random) -> List[str]:
+    """Cloud of `size` unit cubes packed into a ball"""
+    radius = max(2, int((size * 3 / 4) ** (1 / 3)) + 1)
+    cubes = set()
+    while len(cubes) < size:
+        xyz = tuple(rng.randint(-radius, radius) for _ in range(3))
+        if sum(c * c for c in xyz) <= radius * radius:
+            cubes.add(xyz)
+    return ["{},{},{}".format(*(radius + c for c in xyz)) for xyz in cubes]
+
+
+def gen_20(size: int, rng: random.Random) -> List[str]:
+    """Encrypted file with `size` numbers, exactly one of them zero"""
+    size = max(size, 1)
+    numbers = [rng.choice((-1, 1)) * rng.randint(1, 10000)
+               for _ in range(size - 1)]
+    numbers.insert(rng.randint(0, size - 1), 0)
+    return list(map(str, numbers))
+
+
+def gen_21(size: int, rng: random.Random) -> List[str]:
+    """About `size` monkeys yelling numbers or operations.
+    Monkey `humn` occurs exactly once and never as a divisor, all divisions
+    are exact. Subtrees of `root` yield the same value if `humn` yells its
+    original number, so that this number is the answer to part 2.
+    """
+    names = set()
+
+    def new_name():
+        while True:
+            name = "".join(rng.choice(string.ascii_lowercase)
+                           for _ in range(4))
+            if name not in names and name not in ("root", "humn"):
+                names.add(name)
+                return name
+
+    lines = []
+
+    def build(name: str, value: int, count: int, humn: bool = False):
+        """Make monkey `name` yell `value` using `count` monkeys in total.
+        If `humn` is True, monkey humn is one of them.
+        """
+        if count < 3:
+            if humn:
+                # monkey humn must be a leaf
+                lines.append(f"{name}: humn + {new_name_value(0)}")
+                lines.append(f"humn: {value}")
+            else:
+                lines.append(f"{name}: {value}")
+            return
+        count -= 1
+        left = rng.randint(1, count - 1)
+        op = rng.choice("+-*/")
+        # humn must not be the divisor, nor multiplied by zero
+        if op == "*" and (value == 0 or value % 2):
+            op = "+"
+        if op == "+":
+            a = rng.randint(-1000, 1000)
+            b = value - a
+        elif op == "-":
+            b = rng.randint(-1000, 1000)
+            a = value + b
+        elif op == "*":
+            b = 2
+            a = value // 2
+        else:
+            b = rng.randint(1, 10)
+            a = value * b
+        humn_left = humn and (op in "*/" or rng.random() < 0.5)
+        lnames = (new_name(), new_name())
+        lines.append("{}: {} {} {}".format(name, lnames[0], op, lnames[1]))
+        build(lnames[0], a, left, humn and humn_left)
+        build(lnames[1], b, count - left, humn and not humn_left)
+
+    def new_name_value(value: int) -> str:
+        name = new_name()
+        lines.append(f"{name}: {value}")
+        return name
+
+    value = rng.randint(1, 10**6)
+    humn_side, other_side = new_name(), new_name()
+    lines.append(f"root: {humn_side} + {other_side}")
+    count = max(size - 1, 6)
+    build(humn_side, value, count // 2, humn=True)
+    build(other_side, value, count - count // 2)
+    rng.shuffle(lines)
+    return lines
+
+
+GENERATORS: Dict[str, Callable] = {
+    "01": gen_01,
+    "04": gen_04,
+    "06": gen_06,
+    "08": gen_08,
+    "09": gen_09,
+    "10": gen_10,
+    "11": gen_11,
+    "12": gen_12,
+    "15": gen_15,
+    "16": gen_16,
+    "17": gen_17,
+    "18": gen_18,
+    "20": gen_20,
+    "21": gen_21,
+}
+
+
+def generate(day: str, size: int, seed: int = 0) -> List[str]:
+    """Generate input of given `size` for the day `day`"""
+    return GENERATORS[day](size, random.Random(seed))
+
+
+def write(day: str, size: int, fpath: str, seed: int = 0) -> str:
+    """Generate input for the day `day` and save it to the file `fpath`"""
+    with open(fpath, "w") as fd:
+        for line in generate(day, size, seed):
+            fd.write(line + "\n")
+    return fpath
+
+
+def primes(n: int) -> List[int]:
+    """Return first `n` prime numbers"""
+    found = []
+    candidate = 2
+    while len(found) < n:
+        if all(candidate % p for p in found if p * p <= candidate):
+            found.append(candidate)
+        candidate += 1
+    return found
+
+
+def to_letters(num: int) -> str:
+    """Convert a number to base 26 written with letters A-Z"""
+    letters = ""
+    while True:
+        num, rem = divmod(num, 26)
+        letters = string.ascii_uppercase[rem] + letters
+        if not num:
+            return letters
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic input for the given day")
+    parser.add_argument("day", choices=sorted(GENERATORS))
+    parser.add_argument("size", type=int)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="file (default: stdout)")
+    args = parser.parse_args(argv)
+    if args.output:
+        write(args.day, args.size, args.output, args.seed)
+    else:
+        for line in generate(args.day, args.size, args.seed):
+            print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,26 +1,196 @@
 
-from typing import Union, Tuple, List, Optional, Iterable
+import bisect
+import itertools
+from typing import Union, Tuple, List, Optional, Iterable, Iterator
 from .utils import Point, Matrix
 
 
-class BrokenLine(object):
+class IntervalSet(object):
+    """
+    A set of integers stored as sorted disjoint intervals [start, end],
+    both ends included. Overlapping or adjacent intervals are merged, e.g.
+    adding (1, 3) and (4, 6) results in a single interval (1, 6).
+
+    Starts and ends of the intervals are kept in two sorted lists, so that
+    the intervals affected by an operation are found with bisect, in
+    O(log n). Replacing them takes a single slice assignment.
+
+    To build a set from many intervals at once, use from_intervals() or
+    update(): both sort the intervals and merge them in a single pass.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = None):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self._length = 0
+        if intervals:
+            self.update(intervals)
+
+    @classmethod
+    def from_intervals(
+        cls, intervals: Iterable[Tuple[int, int]]
+    ) -> "IntervalSet":
+        """Create a set as the union of given intervals"""
+        iset = cls.__new__(cls)
+        IntervalSet.__init__(iset, intervals)
+        return iset
+
+    def update(self, intervals: Iterable[Tuple[int, int]]):
+        """Add many intervals at once (bulk union). This sorts all intervals
+        and merges them in one pass, O((n + N) log (n + N))."""
+        intervals = sorted(itertools.chain(self, intervals))
+        starts, ends = [], []
+        length = 0
+        for start, end in intervals:
+            if start > end:
+                continue
+            if ends and start <= ends[-1] + 1:
+                if end > ends[-1]:
+                    length += end - ends[-1]
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+                length += end - start + 1
+        self.starts, self.ends, self._length = starts, ends, length
+        return self
+
+    def add(self, start: int, end: int):
+        """Add all integers from `start` to `end` (inclusive)"""
+        if start > end:
+            return self
+        # intervals that overlap or touch [start, end]
+        i = bisect.bisect_left(self.ends, start - 1)
+        j = bisect.bisect_right(self.starts, end + 1)
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j-1])
+            self._length -= self._sum_lengths(i, j)
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+        self._length += end - start + 1
+        return self
+
+    def discard(self, start: int, end: int = None):
+        """Remove all integers from `start` to `end` (inclusive).
+        If `end` is not given, only `start` is removed."""
+        if end is None:
+            end = start
+        if start > end:
+            return self
+        # intervals that overlap [start, end]
+        i = bisect.bisect_left(self.ends, start)
+        j = bisect.bisect_right(self.starts, end)
+        if i >= j:
+            return self
+        new_starts, new_ends = [], []
+        if self.starts[i] < start:
+            new_starts.append(self.starts[i])
+            new_ends.append(start - 1)
+        if self.ends[j-1] > end:
+            new_starts.append(end + 1)
+            new_ends.append(self.ends[j-1])
+        self._length -= self._sum_lengths(i, j)
+        self._length += sum(e - s + 1 for s, e in zip(new_starts, new_ends))
+        self.starts[i:j] = new_starts
+        self.ends[i:j] = new_ends
+        return self
+
+    def _sum_lengths(self, i: int, j: int) -> int:
+        return sum(self.ends[i:j]) - sum(self.starts[i:j]) + (j - i)
+
+    def __ior__(self, other: Union["IntervalSet", Tuple[int, int]]):
+        if isinstance(other, IntervalSet):
+            return self.update(other)
+        return self.add(*other)
+
+    def __isub__(self, other: Union[int, Tuple[int, int], "IntervalSet"]):
+        """Erase `other` from current set. `other` can be one of:
+        * int -- a single point will be erased
+        * Tuple of two ints -- remove an interval
+        * IntervalSet -- remove all its intervals
+        """
+        if isinstance(other, int):
+            self.discard(other)
+        elif isinstance(other, IntervalSet):
+            for start, end in other:
+                self.discard(start, end)
+        elif isinstance(other, (tuple, list)):
+            self.discard(*other)
+        else:
+            raise ValueError(
+                f"Not supported type of argument {type(other)}"
+            )
+        return self
+
+    def __len__(self) -> int:
+        """Number of integers in the set"""
+        return self._length
+
+    def __bool__(self) -> bool:
+        return bool(self.starts)
+
+    def __contains__(self, value: int) -> bool:
+        idx = bisect.bisect_right(self.starts, value) - 1
+        return idx >= 0 and value <= self.ends[idx]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """Iterate over intervals (start, end)"""
+        return zip(self.starts, self.ends)
+
+    def __eq__(self, other: "IntervalSet") -> bool:
+        return (isinstance(other, IntervalSet)
+                and self.starts == other.starts and self.ends == other.ends)
+
+    @property
+    def intervals(self) -> List[Tuple[int, int]]:
+        return list(self)
+
+    def gaps(self, lo: int, hi: int) -> Iterator[Tuple[int, int]]:
+        """Iterate over intervals (start, end) within [lo, hi] that are not
+        in the set"""
+        idx = bisect.bisect_left(self.ends, lo)
+        pos = lo
+        while idx < len(self.starts) and self.starts[idx] <= hi:
+            if self.starts[idx] > pos:
+                yield (pos, self.starts[idx] - 1)
+            pos = max(pos, self.ends[idx] + 1)
+            idx += 1
+        if pos <= hi:
+            yield (pos, hi)
+
+    def complement(self, lo: int, hi: int) -> "IntervalSet":
+        """Return a new set of integers within [lo, hi] that are not in the
+        current set"""
+        return self.from_intervals(self.gaps(lo, hi))
+
+    def positions(self) -> Iterator[int]:
+        """Iterate over all integers in the set"""
+        for start, end in self:
+            yield from range(start, end+1)
+
+    def __repr__(self):
+        return "<{}: length={}, parts={}>".format(
+            self.__class__.__name__, len(self), self.intervals)
+
+
+class BrokenLine(IntervalSet):
     """
     A line segment starting and ending at given positions `start` and `end`.
     Both ends are included.
     It can be continuous or discontinous. The latter consists if a number of
     segments (`parts`), each with its own `start` and `end` values.
-
-    TODO: solve it with a sparse matrix from scipy
     """
     DEBUG = False
 
     def __init__(self, start: int, end: int):
         # start and end are included
-        self.parts: List[Tuple[int, int]] = [(start, end)]
+        super().__init__()
+        self.add(start, end)
 
-    def __len__(self) -> int:
-        """Length of a BrokenLine is the sum of lenths of its subsegments."""
-        return sum(end-start+1 for start, end in self.parts)
+    @property
+    def parts(self) -> List[Tuple[int, int]]:
+        return self.intervals
 
     def _dprint(self, *msgs):
         if self.DEBUG:
@@ -30,66 +200,23 @@ class BrokenLine(object):
         """Delete given position `pos` from the line, if it exists.
         Deletion results in then that contsins `pos` being split in two.
         """
-        idx = self._index_of(pos)
-        if self.DEBUG:
-            p = None if idx is None else self.parts[idx]
-            print(f"Target {pos} found at [{idx}] = {p}")
-        if idx is not None:
-            start, end = self.parts[idx]
-            left, right = (start, pos-1), (pos+1, end)
-            self._dprint("Left/right", left, right)
-            self.parts[idx] = right
-            self.parts.insert(idx, left)
-
-    def __isub__(self, other: Union[int, Tuple[int, int]]):
-        """Erase `other` from current line. `other` can be one of:
-        * int -- a single point will be erased
-        * Tuple of two ints -- remove a subsegment
-        """
-        if isinstance(other, int):
-            # subtract/erase a single point
-            self.erase_at(other)
-        elif isinstance(other, (tuple, list)):
-            # subtract another segment
-            self._dprint("subtracting segment", other)
-            start, end = other
-            self.erase_at(start)
-            self.erase_at(end)
-            self._dprint(f"after splitting: {self.parts}")
-            # remove all subsegments that are completely contained in `other`
-            self.parts = [
-                part
-                for part in self.parts
-                if not all(start <= pos <= end for pos in part)
-            ]
-        else:
-            raise ValueError(
-                f"Not supported type of argument {type(other)}"
-            )
-        return self
+        self.discard(pos)
 
     def _index_of(self, value: int) -> Optional[int]:
         """find index of the segment that contains given value.
         The value can be either within the segment or at any of its ends.
         If not found, return None
         """
-        for idx, part in enumerate(self.parts):
-            if part[0] <= value <= part[1]:
-                return idx
+        idx = bisect.bisect_right(self.starts, value) - 1
+        if idx >= 0 and value <= self.ends[idx]:
+            return idx
         return None
 
     def positions(self) -> List[int]:
         """Return a list of ints that correspond to all positions that
         exist on the line.
         """
-        points = []
-        for start, end in self.parts:
-            points.extend(range(start, end+1))
-        return points
-
-    def __repr__(self):
-        return "<{}: length={}, parts={}>".format(
-            self.__class__.__name__, len(self), self.parts)
+        return list(super().positions())
 
 
 class Shape(object):
@@ -100,16 +227,43 @@ class Shape(object):
     * the origin is located in the top left corner
     * x axis goes from left to right
     * y axis goes from top to bottom
+
+    Besides the ordered list `points`, a shape keeps the set of its points
+    for fast containment and collision tests, and caches its extreme
+    points (top, bottom, left, right) once they have been computed.
+    The list must not be changed in place: assign new points instead, or
+    merge shapes with `+=`, which costs O(m) for a shape of m points.
     """
 
+    # extreme point: (coordinate index, select min or max)
+    EXTREMES = {
+        "top": (1, min),
+        "bottom": (1, max),
+        "left": (0, min),
+        "right": (0, max),
+    }
+
     def __init__(self, points: List[Point] = None):
-        self.points: Tuple[Point] = tuple(points or [])
+        self.points = points or []
         self.name: str = ""
 
+    @property
+    def points(self) -> List[Point]:
+        return self._points
+
+    @points.setter
+    def points(self, points: Iterable[Point]):
+        self._points: List[Point] = list(points)
+        self._cells = set(self._points)
+        self._extremes = {}
+
     def move(self, offsets: Iterable, times: int = 1) -> "Shape":
         if times != 1:
             offsets = [c*times for c in offsets]
-        self.points = tuple(pt + offsets for pt in self.points)
+        extremes = self._extremes
+        self.points = [pt + offsets for pt in self.points]
+        # extreme points move along with the shape
+        self._extremes = {name: pt + offsets for name, pt in extremes.items()}
         return self
 
     def __iadd__(self, other: "Shape"):
@@ -117,51 +271,73 @@ class Shape(object):
         other shape into the current.
         """
         assert self.has_contact_points(other), "Shapes are disjoint"
-        self.points = self.points + tuple(Point(pt) for pt in other.points)
+        new_points = [Point(pt) for pt in other.points]
+        self._points.extend(new_points)
+        self._cells.update(new_points)
+        for name, pt in self._extremes.items():
+            idx, select = self.EXTREMES[name]
+            other_pt = other._extreme(name)
+            if select(pt[idx], other_pt[idx]) != pt[idx]:
+                self._extremes[name] = Point(other_pt)
         # TODO: remove points that are now internal to the current shape?
         return self
 
     def has_contact_points(self, other: "Shape") -> bool:
-        for opt in other.points:
-            for pt in self.points:
-                if pt.l1_dist(opt) == 1:
-                    return True
+        # look up neighbours of the points of the smaller shape among
+        # the points of the larger one
+        small, large = sorted((self, other), key=lambda s: len(s.points))
+        cells = large._cells
+        for x, y in small.points:
+            if ((x+1, y) in cells or (x-1, y) in cells
+                    or (x, y+1) in cells or (x, y-1) in cells):
+                return True
         return False
 
     def __contains__(self, point: Point) -> bool:
-        return any(pt == point for pt in self.points)
+        if not isinstance(point, tuple):
+            point = tuple(point)
+        return point in self._cells
 
     def overlaps_with(self, other: "Shape") -> bool:
         """Detect if the current shape overlaps with other shape"""
+        if isinstance(other, Shape):
+            return not self._cells.isdisjoint(other._cells)
         return any(pt in self for pt in other.points)
 
+    def _extreme(self, name: str) -> Point:
+        """Compute (once) and return given extreme point of the shape.
+        If there are several, then return the first one.
+        """
+        if name not in self._extremes:
+            idx, select = self.EXTREMES[name]
+            value = select(pt[idx] for pt in self.points)
+            self._extremes[name] = next(
+                pt for pt in self.points if pt[idx] == value)
+        return self._extremes[name]
+
     def top(self) -> Point:
         """Return the topmost point.
         If there are several, then return the first one.
         """
-        miny = min(pt.y for pt in self.points)
-        return next(pt for pt in self.points if pt.y == miny)
+        return self._extreme("top")
 
     def bottom(self) -> Point:
         """Return the bottommost point.
         If there are several, then return the first one.
         """
-        maxy = max(pt.y for pt in self.points)
-        return next(pt for pt in self.points if pt.y == maxy)
+        return self._extreme("bottom")
 
     def left(self) -> Point:
         """Return the leftmost point.
         If there are several, then return the first one.
         """
-        minx = min(pt.x for pt in self.points)
-        return next(pt for pt in self.points if pt.x == minx)
+        return self._extreme("left")
 
     def right(self) -> Point:
         """Return the rightmost point.
         If there are several, then return the first one.
         """
-        maxx = max(pt.x for pt in self.points)
-        return next(pt for pt in self.points if pt.x == maxx)
+        return self._extreme("right")
 
     def __repr__(self):
         return "<{}: name='{}' points={}>".format(self.__class__.__name__,
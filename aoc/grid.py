@@ -0,0 +1,86 @@
+"""
+Breadth-first search on 2D grids stored in flat buffers.
+
+A grid of `n_rows` x `n_cols` cells is stored in a flat sequence (e.g.
+array('b')) row after row: cell (r, c) is found at index r * n_cols + c.
+All functions here work with such flat indices, avoiding the creation of
+objects (Vector, tuple) for grid positions.
+"""
+
+from array import array
+from collections import deque
+from typing import List, Tuple, Sequence, Iterable, Callable, Optional
+
+
+def to_index(rc: Tuple[int, int], n_cols: int) -> int:
+    """Convert coordinates (r, c) to the flat index"""
+    return rc[0] * n_cols + rc[1]
+
+
+def to_rc(idx: int, n_cols: int) -> Tuple[int, int]:
+    """Convert flat index to coordinates (r, c)"""
+    return divmod(idx, n_cols)
+
+
+def neighbors4(idx: int, size: int, n_cols: int) -> List[int]:
+    """Flat indices of the cells adjacent to cell `idx` horizontally or
+    vertically in a grid of `size` cells that is `n_cols` wide."""
+    nbs = []
+    if idx >= n_cols:
+        nbs.append(idx - n_cols)
+    if idx + n_cols < size:
+        nbs.append(idx + n_cols)
+    col = idx % n_cols
+    if col > 0:
+        nbs.append(idx - 1)
+    if col < n_cols - 1:
+        nbs.append(idx + 1)
+    return nbs
+
+
+def bfs(
+    cells: Sequence[int],
+    n_cols: int,
+    sources: Iterable[int],
+    can_step: Callable[[int, int], bool] = None,
+    is_target: Callable[[int], bool] = None
+) -> Tuple[array, Optional[int]]:
+    """Compute the shortest distances (in steps) from the cell(s) `sources`
+    to all other cells of the grid stored in the flat sequence `cells`.
+    Every cell is visited at most once, this is O(V).
+
+    Arguments:
+    * sources -- flat indices of starting cells. With several sources, the
+      distance to a cell is the distance from the closest source.
+    * can_step(src_value, trg_value) -- tells whether it is possible to go
+      from a cell to an adjacent one given their values in `cells`.
+      By default, any step is allowed.
+    * is_target(idx) -- if given, the search stops once a cell for which
+      the function is true has been reached.
+
+    Returns a tuple of
+    * array of distances by flat index, with -1 for cells not reached;
+    * flat index of the target reached, or None.
+    """
+    size = len(cells)
+    distances = array('l', [-1]) * size
+    frontier = deque()
+    for idx in sources:
+        distances[idx] = 0
+        frontier.append(idx)
+        if is_target and is_target(idx):
+            return distances, idx
+
+    while frontier:
+        src = frontier.popleft()
+        src_value, dist = cells[src], distances[src] + 1
+        for trg in neighbors4(src, size, n_cols):
+            if distances[trg] > -1:  # already visited
+                continue
+            if can_step is None or can_step(src_value, cells[trg]):
+                distances[trg] = dist
+                if is_target and is_target(trg):
+                    return distances, trg
+                frontier.append(trg)
+
+    return distances, None
@@ -0,0 +1,227 @@
+"""
+Run solutions of many days at once, in parallel, and report the results
+as a single table.
+
+Usage (from the top directory of the repository):
+
+    python -m aoc.runner                 # all days, both parts, real inputs
+    python -m aoc.runner 01 7 12 -p 2    # selected days and part(s)
+    python -m aoc.runner --tests         # test cases instead of real inputs
+    python -m aoc.runner -j 4            # limit the number of processes
+
+Solutions are discovered as day_*/solution.py. Every (day, part, case) is
+an independent job executed in a pool of worker processes. Answers for real
+inputs are checked against those recorded in day_*/answer.txt, answers for
+test cases against the expected values listed in the module.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import importlib.util
+from glob import glob
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Any
+
+from . import utils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (day, part, kind, case index)
+Job = Tuple[str, int, str, int]
+
+
+def discover(root: str = ROOT) -> Dict[str, str]:
+    """Find all solutions and return them as {day: path to solution.py}"""
+    solutions = {}
+    for path in sorted(glob(os.path.join(root, "day_*", "solution.py"))):
+        day = os.path.basename(os.path.dirname(path))[len("day_"):]
+        solutions[day] = path
+    return solutions
+
+
+_modules = {}  # loaded modules, per worker process
+
+
+def load_solution(path: str):
+    """Import solution module from given file `path`.
+    Modules are cached, so every module is imported once per process.
+    """
+    if path not in _modules:
+        name = os.path.basename(os.path.dirname(path)) + "_solution"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return _modules[path]
+
+
+def read_answers(fpath: str) -> Dict[int, str]:
+    """Read answers of real inputs from the file `fpath` (answer.txt) that
+    contains the output of utils.run_real(). Only the answers that were
+    marked as correct are returned, as {part: answer}.
+    """
+    answers = {}
+    if not os.path.exists(fpath):
+        return answers
+    # split into sections "--- Day DD p.N ---" followed by the result
+    sections = re.split(r'^--- Day \w+ p\.(\d) ---$', utils.text_from(fpath),
+                        flags=re.M)
+    for part, body in zip(sections[1::2], sections[2::2]):
+        lines = body.strip("\n").split("\n")
+        if lines[0] == "True":
+            # multiline answer: "True", "Expected and Actual:", answer
+            answers[int(part)] = "\n".join(lines[2:])
+        elif lines[0].startswith("True "):
+            # one line answer: "True expected actual"
+            answers[int(part)] = lines[0].split()[-1]
+    return answers
+
+
+def run_job(path: str, part: int, kind: str, tid: int) -> Dict[str, Any]:
+    """Solve given part of the puzzle on the case number `tid` from either
+    real inputs (kind="real") or test cases (kind="test").
+    Executed in a worker process.
+    """
+    res = {"status": "ERROR", "answer": None, "expected": None,
+           "load": None, "solve": None}
+    try:
+        # inputs are specified relative to the directory of the solution
+        os.chdir(os.path.dirname(path))
+        module = load_solution(path)
+        inp, *expected = (module.reals if kind == "real" else module.tests)[tid]
+        expected = utils.resolve(expected[part-1])
+        if kind == "real":
+            answers = read_answers("answer.txt")
+            expected = answers.get(part, expected)
+        res["expected"] = None if expected is None else str(expected)
+
+        t0 = time.perf_counter()
+        inp = utils.isolated(inp)
+        t1 = time.perf_counter()
+        answer = getattr(module, f"solve_p{part}")(inp)
+        t2 = time.perf_counter()
+
+        res["load"], res["solve"] = t1 - t0, t2 - t1
+        res["answer"] = str(answer)
+        if expected is None:
+            res["status"] = "UNKNOWN"
+        else:
+            res["status"] = "PASS" if res["answer"] == str(expected) else "FAIL"
+    except Exception as ex:
+        res["answer"] = "{}: {}".format(type(ex).__name__, ex)
+    return res
+
+
+def make_jobs(
+    solutions: Dict[str, str], parts: List[int], kind: str
+) -> Tuple[List[Job], Dict[Job, Dict[str, Any]]]:
+    """Create a job for every selected day, part and case.
+
+    Days whose module cannot be imported get a job per part (with case
+    index None) that is not to be run. Their results (with status ERROR)
+    are returned along with the jobs, as {job: result}.
+    """
+    jobs, failed = [], {}
+    for day, path in solutions.items():
+        try:
+            module = load_solution(path)
+        except Exception as ex:
+            for part in parts:
+                job = (day, part, kind, None)
+                jobs.append(job)
+                failed[job] = {
+                    "status": "ERROR", "expected": None,
+                    "load": None, "solve": None,
+                    "answer": "cannot import: {}: {}".format(
+                        type(ex).__name__, ex),
+                }
+            continue
+        cases = module.reals if kind == "real" else module.tests
+        for tid, (_, *expected) in enumerate(cases):
+            for part in parts:
+                if kind == "test" and expected[part-1] is None:
+                    continue
+                jobs.append((day, part, kind, tid))
+    return jobs, failed
+
+
+def fmt_time(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return "{:.1f} us".format(seconds * 1e6)
+    if seconds < 1:
+        return "{:.1f} ms".format(seconds * 1000)
+    return "{:.2f} s".format(seconds)
+
+
+def shorten(text: Optional[str], width: int = 40) -> str:
+    text = str(text).replace("\n", "|")
+    return text if len(text) <= width else text[:width-3] + "..."
+
+
+def report(jobs: List[Job], results: List[Dict[str, Any]]) -> str:
+    """Format results of all jobs as a table"""
+    header = ("Day", "Part", "Case", "Status", "Load", "Solve", "Answer")
+    rows = [header]
+    for (day, part, kind, tid), res in zip(jobs, results):
+        answer = res["answer"]
+        if res["status"] == "FAIL":
+            answer = "{} (expected {})".format(answer, res["expected"])
+        rows.append((
+            day, str(part), "{}.{}".format(kind, "*" if tid is None else tid),
+            res["status"],
+            fmt_time(res["load"]), fmt_time(res["solve"]), shorten(answer, 60)
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    lines = ["  ".join(val.ljust(w) for val, w in zip(row, widths)).rstrip()
+             for row in rows]
+    lines.insert(1, "  ".join("-" * w for w in widths))
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Run solutions of selected days in parallel")
+    parser.add_argument("days", nargs="*",
+                        help="days to run, e.g. 01 7 (default: all)")
+    parser.add_argument("-p", "--parts", nargs="+", type=int,
+                        choices=[1, 2], default=[1, 2])
+    parser.add_argument("-t", "--tests", action="store_true",
+                        help="run test cases instead of real inputs")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    solutions = discover()
+    if args.days:
+        days = [day.zfill(2) for day in args.days]
+        unknown = sorted(set(days) - set(solutions))
+        if unknown:
+            parser.error("no solution for day(s): {}".format(", ".join(unknown)))
+        solutions = {day: solutions[day] for day in sorted(set(days))}
+
+    kind = "test" if args.tests else "real"
+    jobs, failed = make_jobs(solutions, sorted(set(args.parts)), kind)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {job: pool.submit(run_job, solutions[job[0]], *job[1:])
+                   for job in jobs if job not in failed}
+        results = [failed[job] if job in failed else futures[job].result()
+                   for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    print(report(jobs, results))
+    statuses = [res["status"] for res in results]
+    print("\n{} jobs in {}: {}".format(len(jobs), fmt_time(elapsed), ", ".join(
+        "{} {}".format(statuses.count(st), st)
+        for st in ("PASS", "FAIL", "ERROR", "UNKNOWN") if st in statuses)))
+    return int(any(st in {"FAIL", "ERROR"} for st in statuses))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
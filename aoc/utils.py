@@ -1,30 +1,186 @@
 
 import os
+import mmap
+import time
+import numbers
+import operator
 import itertools
 import functools
+from array import array
+from collections.abc import Sequence
 from copy import deepcopy
-from typing import List, Union, Tuple, Optional, Callable, Iterable, Any
+from typing import (
+    List, Dict, Union, Tuple, Optional, Callable, Iterable, Iterator, Any
+)
+
+from . import grid
 
 DEBUG = int(os.environ.get('DEBUG', 0))
 
 
 def load_input(fname: Optional[str] = None, **kwargs) -> List[str]:
     """Load file, either given or default 'input.txt' and return its content
-    as a list of lines. All lines are returned, including empty ones."""
+    as a list of lines. All lines are returned, including empty ones.
+
+    Optional keyword arguments:
+    * line_parser -- a function to apply to every line;
+    * parser -- a function to apply to the whole list of (parsed) lines;
+    * stream -- if True, no list is built. Instead, an iterator over parsed
+      lines is returned, see stream_input().
+    """
+    if kwargs.get("stream"):
+        return stream_input(fname, **kwargs)
     fname = fname or 'input.txt'
-    lines = []
     with open(fname) as fd:
-        for line in fd:
-            lines.append(line.rstrip('\r\n'))
+        # parse while reading to avoid holding an intermediate list
+        return parse_lines((line.rstrip('\r\n') for line in fd), **kwargs)
+
+
+def parse_lines(lines: Iterable[str], **kwargs) -> Any:
+    """Apply `line_parser` and `parser` (see load_input()) to given lines.
+    A new list is always built, `lines` themselves remain untouched.
+    """
+    parse_line = kwargs.get("line_parser")
+    lines = list(map(parse_line, lines)) if parse_line else list(lines)
+    parse = kwargs.get("parser")
+    if parse:
+        lines = parse(lines)
+    return lines
+
+
+def stream_input(fname: Optional[str] = None, **kwargs) -> Iterator:
+    """Streaming counterpart of load_input(): the file is memory-mapped and
+    its lines are read, parsed and yielded one at a time, so that the whole
+    content is never held in memory. The file is opened lazily, when the
+    first line is requested.
+
+    Keyword arguments `line_parser` and `parser` have the same meaning as in
+    load_input(), except that `parser` receives an iterator of lines rather
+    than a list. Each call returns a new iterator that can be consumed once.
+    """
+    lines = iter_lines(fname or 'input.txt')
     parse_line = kwargs.get("line_parser")
     if parse_line:
-        lines = list(map(parse_line, lines))
+        lines = map(parse_line, lines)
     parse = kwargs.get("parser")
     if parse:
         lines = parse(lines)
     return lines
 
 
+def iter_lines(fname: str) -> Iterator[str]:
+    """Yield lines of the file `fname` with line endings removed,
+    reading the file through mmap."""
+    with open(fname, 'rb') as fd:
+        if os.fstat(fd.fileno()).st_size == 0:
+            return  # empty files can not be memory-mapped
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                yield line.decode().rstrip('\r\n')
+
+
+class Lazy(object):
+    """A deferred function call: `func(*args, **kwargs)` is executed only
+    when the object is resolved, see resolve().
+
+    For example, a test case can specify the expected value as
+        Lazy(text_from, "expected.txt")
+    """
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self):
+        return self.func(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        return "<{}: {}(*{}, **{})>".format(self.__class__.__name__,
+            self.func.__name__, self.args, self.kwargs)
+
+
+class Input(Lazy):
+    """Lazy descriptor of puzzle input. It takes the same arguments as
+    load_input() but the file is read and parsed only when the descriptor
+    is resolved by run_tests() or run_real(), not at the time a solution
+    module is imported.
+
+    Every call returns a newly parsed input, therefore solvers are free to
+    modify it. The file is read only once: its raw lines are cached and
+    reparsed on subsequent calls. Streamed inputs are not cached, a new
+    stream over the file is opened instead.
+    """
+
+    def __init__(self, fname: Optional[str] = None, **kwargs):
+        super().__init__(load_input, fname, **kwargs)
+        self._lines: Optional[Tuple[str]] = None  # raw lines
+
+    @property
+    def fname(self) -> str:
+        return self.args[0] or 'input.txt'
+
+    def __call__(self):
+        if self.kwargs.get("stream"):
+            return super().__call__()
+        if self._lines is None:
+            self._lines = tuple(load_input(self.fname))
+        return parse_lines(self._lines, **self.kwargs)
+
+
+def resolve(obj: Any) -> Any:
+    """Execute deferred calls: if `obj` is a Lazy object, return the result
+    of calling it. Tuples are resolved item by item. Anything else is
+    returned as is.
+    """
+    if isinstance(obj, Lazy):
+        return obj()
+    if isinstance(obj, tuple):
+        return tuple(resolve(item) for item in obj)
+    return obj
+
+
+# Types whose objects can be shared between solvers without copying
+IMMUTABLE_TYPES = (
+    type(None), bool, int, float, complex, str, bytes, frozenset, range
+)
+
+# Registry of fast functions to copy objects of specific types.
+CLONERS: Dict[type, Callable] = {}
+
+
+def register_cloner(cls: type, func: Callable):
+    """Register function `func` to copy objects of type `cls` (exactly)
+    in place of (much slower) deepcopy()."""
+    CLONERS[cls] = func
+
+
+def clone(obj: Any) -> Any:
+    """Make a copy of `obj` that can be modified independently of `obj`.
+    Immutable objects are returned as is, otherwise a function registered
+    for the type of `obj` is used. Deepcopy is the last resort.
+    """
+    if isinstance(obj, IMMUTABLE_TYPES):
+        return obj
+    func = CLONERS.get(type(obj))
+    if func:
+        return func(obj)
+    if type(obj) is tuple:
+        return tuple(clone(item) for item in obj)
+    return deepcopy(obj)
+
+
+def isolated(inp: Any) -> Any:
+    """Provide a solver with its own instance of the input `inp`:
+    lazy inputs are loaded anew (see Input), other objects are cloned.
+    """
+    if isinstance(inp, Lazy):
+        return inp()
+    if isinstance(inp, tuple):
+        return tuple(isolated(item) for item in inp)
+    return clone(inp)
+
+
 def text_from(fpath: str):
     with open(fpath) as fd:
         return fd.read().strip("\n")
@@ -66,38 +222,14 @@ def flatten(items: List[List]) -> List:
     """Flatten one level"""
     return [item for subitems in items for item in subitems]
 
-# Source
-# https://stackoverflow.com/questions/55774054/precise-time-in-nano-seconds-for-python-3-6-and-earlier
-
-import ctypes
-
-CLOCK_REALTIME = 0
-
-class timespec(ctypes.Structure):
-    _fields_ = [
-        ('tv_sec', ctypes.c_int64), # seconds, https://stackoverflow.com/q/471248/1672565
-        ('tv_nsec', ctypes.c_int64), # nanoseconds
-    ]
-
-clock_gettime = ctypes.cdll.LoadLibrary('libc.so.6').clock_gettime
-clock_gettime.argtypes = [ctypes.c_int64, ctypes.POINTER(timespec)]
-clock_gettime.restype = ctypes.c_int64
-
-
-def time_ns():
-    tmp = timespec()
-    ret = clock_gettime(CLOCK_REALTIME, ctypes.pointer(tmp))
-    if bool(ret):
-        raise OSError()
-    return tmp.tv_sec * 10 ** 9 + tmp.tv_nsec
-
-
 def mytimeit(func, n=1):
-    """A decorator to measure runtime of a function in nanoseconds"""
+    """A decorator to measure runtime of a function in nanoseconds.
+    This is a one-off measurement, for proper benchmarking see aoc.benchmark
+    """
     def wrapper(*args, **kwargs):
-        start = time_ns()
+        start = time.perf_counter_ns()
         res = func(*args, **kwargs)
-        end = time_ns()
+        end = time.perf_counter_ns()
         print("Runtime[{}]: {} nsec".format(func.__name__, end-start))
         return res
     return wrapper
@@ -142,6 +274,43 @@ def listfold(lst: List[Any], width: int) -> List[List[Any]]:
     return reshaped
 
 
+def find_cycle(
+    func: Callable, x0: Any, limit: Optional[int] = None
+) -> Optional[Tuple[int, int]]:
+    """Find the cycle in the sequence x0, func(x0), func(func(x0)), ...
+    using Brent's algorithm. Return a 2-tuple
+    * mu -- index of the first element of the cycle;
+    * lam -- length of the cycle.
+    Only a few elements are held in memory at any time.
+    If given, at most `limit` elements are computed while searching for
+    the cycle, and None is returned if it has not been found by then.
+    """
+    power = lam = 1
+    tortoise, hare = x0, func(x0)
+    steps = 1
+    while tortoise != hare:
+        if limit is not None and steps >= limit:
+            return None
+        if power == lam:
+            # start a new power of two
+            tortoise = hare
+            power *= 2
+            lam = 0
+        hare = func(hare)
+        lam += 1
+        steps += 1
+
+    # the hare is lam elements ahead of the tortoise, they meet at mu
+    tortoise = hare = x0
+    for _ in range(lam):
+        hare = func(hare)
+    mu = 0
+    while tortoise != hare:
+        tortoise, hare = func(tortoise), func(hare)
+        mu += 1
+    return mu, lam
+
+
 def test2str(success, expected, actual):
     lines = []
     if "\n" in str(expected) or "\n" in str(actual):
@@ -161,15 +330,20 @@ def run_tests(
     solve_p1: Callable = None,
     solve_p2: Callable = None
 ):
+    """Run test cases. Lazy inputs and expected values (see Input and Lazy)
+    are resolved only when a case is actually executed. Each part receives
+    its own instance of the input, see isolated()."""
     print(f"--- Tests day {day} ---")
 
     for tid, (inp, exp1, exp2) in enumerate(tests):
         if solve_p1 and exp1 is not None:
-            res1 = solve_p1(deepcopy(inp))
+            res1 = solve_p1(isolated(inp))
+            exp1 = resolve(exp1)
             print(f"T.{tid}.p1:", test2str(res1 == exp1, exp1, res1))
 
         if solve_p2 and exp2 is not None:
-            res2 = solve_p2(inp)
+            res2 = solve_p2(isolated(inp))
+            exp2 = resolve(exp2)
             print(f"T.{tid}.p2:", test2str(res2 == exp2, exp2, res2))
 
 
@@ -180,140 +354,301 @@ def run_real(
     solve_p2: Callable = None
 ):
     for tid, (inp, exp1, exp2) in enumerate(tests):
+        exp1, exp2 = resolve((exp1, exp2))
+
         print(f"--- Day {day} p.1 ---")
-        res1 = solve_p1(deepcopy(inp))
+        res1 = solve_p1(isolated(inp))
         print(test2str(exp1 == res1, exp1, res1))
 
         print(f"--- Day {day} p.2 ---")
-        res2 = solve_p2(inp)
+        res2 = solve_p2(isolated(inp))
         print(test2str(exp2 == res2, exp2, res2))
 
 
-class Vector(object):
+class Vector(tuple):
+    """Immutable vector of numbers: a tuple that supports elementwise
+    addition and subtraction of vectors and other sequences of the same
+    length, and multiplication by a number. Operations on 2D and 3D vectors
+    have specialized fast paths.
+
+    Unlike a tuple, a vector is not repeated by `v * 3`, all elements are
+    multiplied instead. Other operations of tuples (slicing, comparison)
+    behave as usual.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, values: Iterable = None):
+        return tuple.__new__(cls, () if values is None else values)
 
-    def __init__(self, values: Iterable = None):
-        self.values = list(values or [])
+    def __init__(self, *args, **kwargs):
+        # The object is fully built in __new__(). Accepting arguments here
+        # allows subclasses to call super().__init__(*args)
+        pass
+
+    @property
+    def values(self) -> List:
+        """Elements as a new list. Vectors are immutable, changing the list
+        does not change the vector."""
+        return list(self)
 
-    def __hash__(self):
-        return hash(tuple(self.values))
+    __hash__ = tuple.__hash__
 
     def __add__(self, other: Union["Vector", Iterable]) -> "Vector":
-        return self.pairwise(other, lambda a, b: a+b)
+        n = len(self)
+        if n == 2 == len(other):
+            (x, y), (ox, oy) = self, other
+            return tuple.__new__(self.__class__, (x+ox, y+oy))
+        if n == 3 == len(other):
+            (x, y, z), (ox, oy, oz) = self, other
+            return tuple.__new__(self.__class__, (x+ox, y+oy, z+oz))
+        return self.pairwise(other, operator.add)
+
+    __radd__ = __add__
 
     def __sub__(self, other: Union["Vector", Iterable]) -> "Vector":
-        return self.pairwise(other, lambda a, b: a-b)
+        n = len(self)
+        if n == 2 == len(other):
+            (x, y), (ox, oy) = self, other
+            return tuple.__new__(self.__class__, (x-ox, y-oy))
+        if n == 3 == len(other):
+            (x, y, z), (ox, oy, oz) = self, other
+            return tuple.__new__(self.__class__, (x-ox, y-oy, z-oz))
+        return self.pairwise(other, operator.sub)
+
+    def __rsub__(self, other: Union["Vector", Iterable]) -> "Vector":
+        return self.pairwise(other, lambda a, b: b-a)
+
+    def __mul__(self, num: numbers.Number) -> "Vector":
+        if not isinstance(num, numbers.Number):
+            # not tuple repetition: TypeError
+            return NotImplemented
+        return tuple.__new__(self.__class__, [v * num for v in self])
+
+    __rmul__ = __mul__
 
     def pairwise(
         self,
         other: Union["Vector", Iterable],
-        func: Callable   # functools.reduce()
+        func: Callable   # func(a, b)
     ) -> "Vector":
         assert len(self) == len(other), (
             f"Length mismatch: {len(self)} vs. {len(other)}"
         )
-        values = [functools.reduce(func, pair) for pair in zip(self, other)]
-        return self.__class__(values)
-
-    # def __getattr__(self, name: str):
-    #     print("method", name, type(name))
+        return tuple.__new__(self.__class__, map(func, self, other))
 
     def __abs__(self):
-        # TODO: implement generically via __getattr__
-        return self.__class__(abs(v) for v in self)
-
-    def __len__(self):
-        return len(self.values)
-
-    def __iter__(self):
-        return iter(self.values)
+        return tuple.__new__(self.__class__, map(abs, self))
 
     def __repr__(self):
-        return "<{}: values={}>".format(self.__class__.__name__, self.values)
+        return "<{}: values={}>".format(self.__class__.__name__, list(self))
 
     def __str__(self):
-        return str(tuple(self.values))
+        return tuple.__repr__(self)
 
-    def __getitem__(self, idx: int):
-        return self.values[idx]
+    def __eq__(self, other: Union["Vector", Iterable]):
+        if not isinstance(other, tuple):
+            other = tuple(other)
+        return tuple.__eq__(self, other)
 
-    def __eq__(self, other: "Vector"):
-        return tuple(self.values) == tuple(other)
+    def __ne__(self, other: Union["Vector", Iterable]):
+        return not self == other
 
 
 class Point(Vector):
     """for purposes of clearer naming"""
 
-    def __init__(self, *coords: Union[int, List[int]]):
-        if isinstance(coords[0], (list, tuple, type(self))):
-            super().__init__(*coords)
-        else:
-            super().__init__(coords)
+    __slots__ = ()
 
-    @property
-    def x(self):
-        return self[0]
+    def __new__(cls, *coords: Union[int, List[int]]):
+        if isinstance(coords[0], (list, tuple)):
+            coords = coords[0]
+        return tuple.__new__(cls, coords)
 
-    @property
-    def y(self):
-        return self[1]
-
-    @property
-    def z(self):
-        return self[2]
+    x = property(operator.itemgetter(0))
+    y = property(operator.itemgetter(1))
+    z = property(operator.itemgetter(2))
 
     def l1_dist(self, other: 'Point') -> int:
         """L1 distance aka Manhattan distance"""
-        return sum(*abs(self - other))
+        if len(self) == 2:
+            (x, y), (ox, oy) = self, other
+            return abs(x-ox) + abs(y-oy)
+        return sum(abs(a-b) for a, b in zip(self, other))
 
     def __lt__(self, other: 'Point'):
         return self.x < other.x or self.x == other.x and self.y < other.y
 
 
+# vectors are immutable
+register_cloner(Vector, lambda vec: vec)
+register_cloner(Point, lambda pt: pt)
+
+
 class Matrix(object):
     """Matrix
 
     Implementing it for fun.
     Not as good as pandas dataframe
+
+    Values are stored in a single flat buffer `data`, row after row: the
+    value at (x, y) is data[x * n_cols + y]. By default, the buffer is
+    a list, which can hold values of any type. Given a `typecode`, it is
+    an array.array instead, e.g. Matrix(3, 4, 0, typecode='b').
+
+    Accessors
+    * m[x, y], m.get((x, y), default) -- coordinates are checked;
+    * m.at(x, y), m.data[idx] -- no checks, for use in hot loops;
+    * m.row(x), m.column(y) -- views that do not copy any data.
     """
-    def __init__(self, *args):
+    def __init__(self, *args, typecode: Optional[str] = None):
         if len(args) == 1:
             # from List[List]
-            shape = len(args[0]), len(args[0][0])
-            self.__init__(*shape)
-            self.values = args[0]  # TODO: make a copy of 2 levels
+            rows = args[0]
+            n_rows, n_cols = len(rows), len(rows[0])
+            data = [value for row in rows for value in row]
         elif len(args) > 1:
             n_rows, n_cols = args[:2]
             value = args[2] if len(args) > 2 else 0
-            self.values = [[value] * n_cols for _ in range(n_rows)]
+            data = [value] * (n_rows * n_cols)
+        else:
+            raise TypeError("Matrix() takes either List[List] or "
+                            "n_rows, n_cols[, value]")
+        self.n_rows, self.n_cols = n_rows, n_cols
+        self.size = n_rows * n_cols
+        self.strides = (n_cols, 1)
+        self.typecode = typecode
+        self.data = array(typecode, data) if typecode else data
 
     def shape(self):
-        return (len(self.values), len(self.values[0]))
+        return (self.n_rows, self.n_cols)
+
+    @property
+    def values(self) -> Tuple[Tuple]:
+        """Matrix as a tuple of rows. This is a read-only copy: values
+        must be changed via m[x, y], m.set_at() or views m.row(x)."""
+        return tuple(tuple(self.row(x)) for x in range(self.n_rows))
+
+    def copy(self) -> "Matrix":
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other.data = self.data[:]
+        return other
 
     def _is_in_span(self, xy: Tuple[int, int]) -> bool:
         """Check that given coordinate `xy` exists in the matrix"""
-        n_rows, n_cols = self.shape()
         x, y = xy
-        return 0 <= x < n_rows and 0 <= y < n_cols
+        return 0 <= x < self.n_rows and 0 <= y < self.n_cols
 
     def __getitem__(self, xy: Tuple[int, int]):
-        if self._is_in_span(xy):
-            x, y = xy
-            return self.values[x][y]
+        x, y = xy
+        if 0 <= x < self.n_rows and 0 <= y < self.n_cols:
+            return self.data[x * self.n_cols + y]
         raise IndexError(f"Matrix index {xy} out of range")
 
     def __setitem__(self, xy: Tuple[int, int], newval: Any):
-        if self._is_in_span(xy):
-            x, y = xy
-            self.values[x][y] = newval
+        x, y = xy
+        if 0 <= x < self.n_rows and 0 <= y < self.n_cols:
+            self.data[x * self.n_cols + y] = newval
         else:
             raise IndexError(f"Matrix index {xy} out of range")
 
     def get(self, xy: Tuple[int, int], default = None):
-        if self._is_in_span(xy):
-            x, y = xy
-            return self.values[x][y]
-        else:
-            return default
+        x, y = xy
+        if 0 <= x < self.n_rows and 0 <= y < self.n_cols:
+            return self.data[x * self.n_cols + y]
+        return default
+
+    def at(self, x: int, y: int):
+        """Value at (x, y). Coordinates are not checked"""
+        return self.data[x * self.n_cols + y]
+
+    def set_at(self, x: int, y: int, newval: Any):
+        """Set value at (x, y). Coordinates are not checked"""
+        self.data[x * self.n_cols + y] = newval
+
+    def index(self, x: int, y: int) -> int:
+        """Flat index of (x, y) in `data`"""
+        return x * self.n_cols + y
+
+    def coords(self, idx: int) -> Tuple[int, int]:
+        """Coordinates (x, y) of flat index `idx`"""
+        return divmod(idx, self.n_cols)
+
+    def neighbors4(self, idx: int) -> List[int]:
+        """Flat indices of the cells adjacent to the cell at flat index
+        `idx` horizontally or vertically"""
+        return grid.neighbors4(idx, self.size, self.n_cols)
+
+    def row(self, x: int) -> "MatrixView":
+        if not 0 <= x < self.n_rows:
+            raise IndexError(f"Matrix row {x} out of range")
+        return MatrixView(self.data, x * self.n_cols, 1, self.n_cols)
+
+    def column(self, y: int) -> "MatrixView":
+        if not 0 <= y < self.n_cols:
+            raise IndexError(f"Matrix column {y} out of range")
+        return MatrixView(self.data, y, self.n_cols, self.n_rows)
 
     def __str__(self):
-        return "\n".join([str(row) for row in self.values])
+        return "\n".join([str(list(self.row(x))) for x in range(self.n_rows)])
+
+
+class MatrixView(Sequence):
+    """A row or a column of a Matrix: `length` items of the flat buffer
+    `data` starting at index `start`, `step` items apart.
+    No data is copied, changes are visible in the matrix and vice versa.
+    Slicing a view gives another view.
+    """
+    __slots__ = ("data", "start", "step", "length")
+
+    def __init__(self, data, start: int, step: int, length: int):
+        self.data = data
+        self.start, self.step, self.length = start, step, length
+
+    def __len__(self):
+        return self.length
+
+    def _index(self, idx: int) -> int:
+        if idx < 0:
+            idx += self.length
+        if not 0 <= idx < self.length:
+            raise IndexError("MatrixView index out of range")
+        return self.start + idx * self.step
+
+    def _slice(self, idx: slice) -> "MatrixView":
+        rng = range(self.length)[idx]
+        return self.__class__(self.data, self.start + rng.start * self.step,
+                              rng.step * self.step, len(rng))
+
+    def __getitem__(self, idx: Union[int, slice]):
+        if isinstance(idx, slice):
+            return self._slice(idx)
+        return self.data[self._index(idx)]
+
+    def __setitem__(self, idx: Union[int, slice], newval: Any):
+        if isinstance(idx, slice):
+            view, newvals = self._slice(idx), list(newval)
+            if len(newvals) != len(view):
+                raise ValueError("MatrixView slice assignment can not "
+                                 "change the length")
+            for pos, val in zip(view.positions(), newvals):
+                self.data[pos] = val
+        else:
+            self.data[self._index(idx)] = newval
+
+    def positions(self) -> range:
+        """Indices of items of the view in the flat buffer"""
+        return range(self.start, self.start + self.length * self.step,
+                     self.step)
+
+    def __iter__(self) -> Iterator:
+        data = self.data
+        for idx in self.positions():
+            yield data[idx]
+
+    def __repr__(self):
+        return "<{}: {}>".format(self.__class__.__name__, list(self))
+
+
+register_cloner(Matrix, Matrix.copy)
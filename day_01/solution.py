@@ -44,11 +44,11 @@ def solve_p2(lines: List[str]) -> int:
 
 
 tests = [
-    (utils.load_input('test.1.txt', line_parser=parse), 24000, 45000),
+    (utils.Input('test.1.txt', line_parser=parse), 24000, 45000),
 ]
 
 reals = [
-    (utils.load_input(line_parser=parse), 71023, 206289)
+    (utils.Input(line_parser=parse, stream=True), 71023, 206289)
 ]
 
 
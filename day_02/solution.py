@@ -71,11 +71,11 @@ def solve_p2(lines: List[str]) -> int:
 
 
 tests = [
-    (utils.load_input('test.1.txt'), 15, 12),
+    (utils.Input('test.1.txt'), 15, 12),
 ]
 
 reals = [
-    (utils.load_input(), 10816, 11657)
+    (utils.Input(), 10816, 11657)
 ]
 
 
@@ -63,11 +63,11 @@ def solve_p2(lines: List[str]) -> int:
 
 
 tests = [
-    (utils.load_input('test.1.txt'), 157, 70),
+    (utils.Input('test.1.txt'), 157, 70),
 ]
 
 reals = [
-    (utils.load_input(), 8105, 2363)
+    (utils.Input(), 8105, 2363)
 ]
 
 
@@ -40,11 +40,11 @@ def solve_p2(lines: List[str]) -> int:
 
 
 tests = [
-    (utils.load_input('test.1.txt', line_parser=parse), 2, 4),
+    (utils.Input('test.1.txt', line_parser=parse), 2, 4),
 ]
 
 reals = [
-    (utils.load_input(line_parser=parse), 550, 931)
+    (utils.Input(line_parser=parse, stream=True), 550, 931)
 ]
 
 
@@ -57,12 +57,12 @@ def solve_p2(args) -> str:
 
 
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), "CMZ", "MCD"),
+    (utils.Input('test.1.txt', parser=parse), "CMZ", "MCD"),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), "TPGVQPFDH", "DMRDFRHHH")
+    (utils.Input(parser=parse), "TPGVQPFDH", "DMRDFRHHH")
 ]
 
 
@@ -55,7 +55,7 @@ tests = [
 
 
 reals = [
-    (utils.load_input(parser=parse), 1300, 3986)
+    (utils.Input(parser=parse), 1300, 3986)
 ]
 
 
@@ -107,12 +107,12 @@ def solve_p2(fs: FSObject) -> int:
 
 
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 94853 + 584, 24933642),
+    (utils.Input('test.1.txt', parser=parse), 94853 + 584, 24933642),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), 1454188, 4183246)
+    (utils.Input(parser=parse), 1454188, 4183246)
 ]
 
 
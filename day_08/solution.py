@@ -7,11 +7,16 @@
 import re
 import os
 import sys
-from typing import List
+from typing import List, Sequence
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from aoc import utils
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 DAY = '08'
 DEBUG = int(os.environ.get('DEBUG', 0))
 
@@ -22,8 +27,8 @@ def parse(line: str) -> str:
     return list(map(int, list(line)))
 
 
-def solve_p1(lines: List[str]) -> int:
-    """Solution to the 1st part of the challenge
+def solve_p1_v1(lines: List[str]) -> int:
+    """Solution to the 1st part of the challenge. O(R*C*(R+C))
 
     Algorithm:
     For all surrounding trees, compute how much taller they are than
@@ -60,8 +65,8 @@ def solve_p1(lines: List[str]) -> int:
     return c_visible
 
 
-def solve_p2(lines: List[str]) -> int:
-    """Solution to the 2nd part of the challenge
+def solve_p2_v1(lines: List[str]) -> int:
+    """Solution to the 2nd part of the challenge. O(R*C*(R+C))
 
     Algorithm:
     For every tree, get trees on each of the four sides, rearranging
@@ -103,13 +108,114 @@ def solve_p2(lines: List[str]) -> int:
     return best_score
 
 
+def visible_from_start(heights: Sequence[int]) -> List[bool]:
+    """Tell for every tree in the line of trees `heights` whether it is
+    visible from the start of the line.
+
+    Algorithm:
+    Keep the height of the tallest tree seen so far. Any tree that is
+    taller than that is visible.
+    """
+    tallest = -1
+    visible = []
+    for height in heights:
+        visible.append(height > tallest)
+        tallest = max(tallest, height)
+    return visible
+
+
+def viewing_distances(heights: Sequence[int]) -> List[int]:
+    """For every tree in the line of trees `heights`, compute how many trees
+    can be seen from it when looking back towards the start of the line.
+
+    Algorithm:
+    Maintain a stack of trees that are not blocked by a closer tree of
+    the same or larger height, that is, heights on the stack do not
+    increase. For the current tree, pop all trees that are lower than it.
+    The tree on the top of the stack, if any, is the first one that blocks
+    the view, otherwise the view reaches the edge.
+    """
+    stack = []  # (height, index)
+    distances = []
+    for idx, height in enumerate(heights):
+        while stack and stack[-1][0] < height:
+            stack.pop()
+        distances.append(idx - stack[-1][1] if stack else idx)
+        stack.append((height, idx))
+    return distances
+
+
+def solve_p1(lines: List[List[int]]) -> int:
+    """Solution to the 1st part of the challenge. O(R*C)
+
+    Algorithm:
+    Sweep every row and column in both directions and mark trees visible
+    from the start of the sweep.
+    """
+    if np is not None:
+        return count_visible_np(lines)
+    maxr, maxc = len(lines), len(lines[0])
+    visible = [[False] * maxc for _ in range(maxr)]
+    for r, row in enumerate(lines):
+        left = visible_from_start(row)
+        right = visible_from_start(row[::-1])[::-1]
+        for c in range(maxc):
+            visible[r][c] = left[c] or right[c]
+    for c, column in enumerate(zip(*lines)):
+        above = visible_from_start(column)
+        below = visible_from_start(column[::-1])[::-1]
+        for r in range(maxr):
+            visible[r][c] = visible[r][c] or above[r] or below[r]
+    return sum(map(sum, visible))
+
+
+def count_visible_np(lines: List[List[int]]) -> int:
+    """Vectorized version of solve_p1() based on cumulative maxima"""
+    grid = np.array(lines, dtype=np.int8)
+    visible = np.zeros(grid.shape, dtype=bool)
+    for k in range(4):
+        # look at the forest from each of four sides in turn
+        trees = np.rot90(grid, k)
+        tallest = np.maximum.accumulate(trees, axis=1)
+        # the tallest tree before the current one, -1 at the edge
+        tallest = np.concatenate(
+            [np.full((trees.shape[0], 1), -1, dtype=trees.dtype),
+             tallest[:, :-1]],
+            axis=1)
+        visible |= np.rot90(trees > tallest, -k)
+    return int(visible.sum())
+
+
+def solve_p2(lines: List[List[int]]) -> int:
+    """Solution to the 2nd part of the challenge. O(R*C)
+
+    Algorithm:
+    Sweep every row and column in both directions computing viewing
+    distances with a monotonic stack. Scenic score of a tree is
+    the product of its four viewing distances.
+    """
+    maxr, maxc = len(lines), len(lines[0])
+    scores = [[1] * maxc for _ in range(maxr)]
+    for r, row in enumerate(lines):
+        left = viewing_distances(row)
+        right = viewing_distances(row[::-1])[::-1]
+        for c in range(maxc):
+            scores[r][c] *= left[c] * right[c]
+    for c, column in enumerate(zip(*lines)):
+        above = viewing_distances(column)
+        below = viewing_distances(column[::-1])[::-1]
+        for r in range(maxr):
+            scores[r][c] *= above[r] * below[r]
+    return max(map(max, scores))
+
+
 tests = [
-    (utils.load_input('test.1.txt', line_parser=parse), 21, 8),
+    (utils.Input('test.1.txt', line_parser=parse), 21, 8),
 ]
 
 
 reals = [
-    (utils.load_input(line_parser=parse), 1681, 201684)
+    (utils.Input(line_parser=parse), 1681, 201684)
 ]
 
 
@@ -7,10 +7,11 @@
 import re
 import os
 import sys
-from typing import List, Tuple
+from typing import List, Tuple, Callable, Dict
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from aoc import utils
+from aoc.utils import Vector
 
 DAY = '09'
 DEBUG = int(os.environ.get('DEBUG', 0))
@@ -30,6 +31,14 @@ def parse(line: str) -> str:
     return (OFFSETS[d], int(steps))
 
 
+# There are several strategies of moving the rope. Each of them is
+# a function simulate_*(moves, num_knots) that moves the rope of `num_knots`
+# knots (including the head) and returns the number of positions visited
+# by the last knot. See STRATEGIES and compare_strategies().
+
+# Strategy "tuple": knots are tuples, all of them move after every step
+# of the head.
+
 def move_tail_knot(head: Tuple[int, int], tail: Tuple[int, int]):
     """Compute new state of `tail` given the state of `head`
     """
@@ -46,14 +55,11 @@ def move_tail_knot(head: Tuple[int, int], tail: Tuple[int, int]):
     return (tail[0]+tx, tail[1]+ty)
 
 
-def solve_p1(moves: List, num_of_tail_knots: int = 1) -> int:
-    """Solution to the 1st part of the challenge"""
-    # print("Moves", moves)
+def simulate_tuple(moves: List, num_knots: int) -> int:
     visited = {}
     head = (0, 0)
-    knots = [(0, 0) for _ in range(num_of_tail_knots)]
-    visited[knots[-1]] = 1
-    # print("Initial\t", head, knots)
+    knots = [(0, 0) for _ in range(num_knots - 1)]
+    visited[knots[-1] if knots else head] = 1
     for (mx, my), steps in moves:
         for _ in range(steps):
             # move the head knot
@@ -62,33 +68,184 @@ def solve_p1(moves: List, num_of_tail_knots: int = 1) -> int:
             for idx, tail in enumerate(knots):
                 _head = knots[idx-1] if idx else head
                 knots[idx] = move_tail_knot(_head, tail)
-            visited[knots[-1]] = 1
-            # print(head, knots[-1])
+            visited[knots[-1] if knots else head] = 1
+    return len(visited)
+
+
+# Strategy "vector": knots are Vectors, after every step of the head the
+# knots move one after another until one of them does not move.
 
-    # print("Final\t", head, knots)
+def compute_move(head: Vector, tail: Vector) -> Tuple[int, int]:
+    """The `head` knot is just the knot immediately preceding
+    the `tail` knot
+    """
+    dist = head - tail
+    if max(abs(dist)) < 2:  # chebyshev distance
+        # if head and tail are adjacent, no moving necessary
+        move = (0, 0)
+    else:
+        # a move is at most *one* step regardless of how far are the knotes
+        # from each other.
+        move = [d // abs(d) if d else d for d in dist]
+    return move
+
+
+def move_the_rope(knots: List[Vector], head_move: Tuple[int, int]):
+    for idx, knot in enumerate(knots):
+        if idx == 0:
+            move = head_move
+        else:
+            move = compute_move(knots[idx-1], knot)
+        if all(m == 0 for m in move):
+            # if the current knot does not move, subsequent knots will
+            # not move either. We therefore finish this time step.
+            break
+        knots[idx] = knot + move
+
+
+def simulate_vector(moves: List, num_knots: int) -> int:
+    knots = [Vector((0, 0)) for _ in range(num_knots)]
+    visited = {knots[-1]}
+    for move, times in moves:
+        for _ in range(times):
+            move_the_rope(knots, move)
+            visited.add(knots[-1])
+    return len(visited)
+
+
+# Strategy "early-exit": instead of moving all knots after every step of
+# the head, a whole move of the head is processed at once, knot by knot:
+# the path of the head during the move gives the path of the 1st knot,
+# which gives the path of the 2nd knot, and so on. A knot that does not
+# move does not change the path of the next knot, so only the positions
+# where a knot moved are kept. Once a knot does not move at all, none of
+# the following knots moves either and the move is finished.
+
+# Visited positions (x, y) are stored as single ints x * PACK + y
+PACK = 1 << 32
+
+
+def follow(path: List[Tuple[int, int]], knot: Tuple[int, int]):
+    """Compute the path of the `knot` that follows a knot moving along
+    the `path`. Only the positions where `knot` moved are returned."""
+    x, y = knot
+    moved = []
+    for hx, hy in path:
+        dx, dy = hx - x, hy - y
+        if -2 < dx < 2 and -2 < dy < 2:
+            continue  # still adjacent
+        x += (dx > 0) - (dx < 0)
+        y += (dy > 0) - (dy < 0)
+        moved.append((x, y))
+    return moved
+
+
+def simulate_early_exit(moves: List, num_knots: int) -> int:
+    knots = [(0, 0)] * num_knots
+    visited = {0}
+    for (mx, my), steps in moves:
+        if steps < 1:
+            continue
+        hx, hy = knots[0]
+        path = [(hx + mx * i, hy + my * i) for i in range(1, steps + 1)]
+        knots[0] = path[-1]
+        for idx in range(1, num_knots):
+            path = follow(path, knots[idx])
+            if not path:
+                break
+            knots[idx] = path[-1]
+        else:
+            visited.update(x * PACK + y for x, y in path)
     return len(visited)
 
 
-def solve_p2(moves: List) -> int:
+STRATEGIES: Dict[str, Callable] = {
+    "tuple": simulate_tuple,
+    "vector": simulate_vector,
+    "early-exit": simulate_early_exit,
+}
+
+
+def simulate(moves: List, num_knots: int, strategy: str = "early-exit") -> int:
+    """Move the rope of `num_knots` knots (including the head) using given
+    `strategy` and return the number of positions visited by the last knot.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    return STRATEGIES[strategy](moves, num_knots)
+
+
+def solve_p1(moves: List, num_knots: int = 2, **kwargs) -> int:
+    """Solution to the 1st part of the challenge"""
+    return simulate(moves, num_knots, **kwargs)
+
+
+def solve_p2(moves: List, **kwargs) -> int:
     """Solution to the 2nd part of the challenge"""
-    return solve_p1(moves, 9)
+    return simulate(moves, 10, **kwargs)
+
+
+def compare_strategies(
+    sizes: List[int] = (1000, 5000),
+    rope_lengths: List[int] = (2, 10, 50),
+    repeat: int = 3
+):
+    """Time all strategies on the real input (if available) and on
+    synthetic inputs of given `sizes` (number of moves), with ropes of
+    given lengths, and report the fastest strategy for each case.
+    """
+    from aoc import generators
+    from aoc.benchmark import timed, fmt_ns
+
+    inputs = []
+    try:
+        inputs.append(("input.txt", reals[0][0]()))
+    except (OSError, UnicodeDecodeError) as ex:
+        print(f"Real input skipped: {ex}")
+    for size in sizes:
+        moves = [parse(line) for line in generators.generate(DAY, size)]
+        inputs.append(("synthetic:{}".format(size), moves))
+
+    strategies = list(STRATEGIES)
+    rows = [["Input", "Knots"] + strategies + ["Winner"]]
+    for name, moves in inputs:
+        for num_knots in rope_lengths:
+            times, answers = {}, set()
+            for strategy in strategies:
+                runs = [timed(simulate, moves, num_knots, strategy)
+                        for _ in range(repeat)]
+                answers.update(answer for answer, _ in runs)
+                times[strategy] = min(elapsed for _, elapsed in runs)
+            assert len(answers) == 1, f"Strategies disagree: {answers}"
+            winner = min(times, key=times.get)
+            rows.append([name, str(num_knots)]
+                        + [fmt_ns(times[s]) for s in strategies] + [winner])
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(val.ljust(w) for val, w in zip(row, widths)).rstrip())
 
 
 tests = [
     # debug
-    # (utils.load_input('test.2.txt', line_parser=parse), 5, None),
+    # (utils.Input('test.2.txt', line_parser=parse), 5, None),
 
     # task examples
-    (utils.load_input('test.1.txt', line_parser=parse), 13, 1),
-    (utils.load_input('test.3.txt', line_parser=parse), None, 36),
+    (utils.Input('test.1.txt', line_parser=parse), 13, 1),
+    (utils.Input('test.3.txt', line_parser=parse), None, 36),
+    # moves of zero steps
+    (utils.Input('test.4.txt', line_parser=parse), 9, 1),
 ]
 
 
 reals = [
-    (utils.load_input(line_parser=parse), 5695, 2434)
+    (utils.Input(line_parser=parse), 5695, 2434)
 ]
 
 
 if __name__ == '__main__':
+    if "--compare" in sys.argv[1:]:
+        compare_strategies()
+        sys.exit(0)
     utils.run_tests(DAY, tests, solve_p1, solve_p2)
     utils.run_real(DAY, reals, solve_p1, solve_p2)
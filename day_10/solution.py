@@ -7,7 +7,11 @@
 import re
 import os
 import sys
-from typing import List, Generator
+import bisect
+from array import array
+from typing import (
+    List, Tuple, Sequence, Iterable, Iterator, Generator, Optional
+)
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from aoc import utils
@@ -29,77 +33,124 @@ def parse(line: str) -> str:
         raise ValueError("Oops", line)
 
 
+class CPU(object):
+    """CPU executing a program of `instructions`, each of them a 2-tuple
+    (number of cycles it takes, value to add to register X once done).
+    The program is never modified.
+
+    Cycles are numbered from 1. During a cycle, register X holds the value
+    set by the instructions that completed before that cycle.
+    """
+
+    def __init__(self, instructions: Sequence[Tuple[int, int]]):
+        self.instructions = instructions
+        self._boundaries = None
+
+    def boundaries(self) -> Tuple[array, array]:
+        """Instruction boundaries (computed once) as 2 arrays `ends`, `xs`:
+        ends[i] is the cycle during which instruction i completes and
+        xs[i+1] is the value of X after it."""
+        if self._boundaries is None:
+            ends, xs = array('q'), array('q', [1])
+            cycle, reg_x = 0, 1
+            for ttl, val in self.instructions:
+                cycle += ttl
+                reg_x += val
+                ends.append(cycle)
+                xs.append(reg_x)
+            self._boundaries = ends, xs
+        return self._boundaries
+
+    @property
+    def num_cycles(self) -> int:
+        ends, _ = self.boundaries()
+        return ends[-1] if ends else 0
+
+    def x_during(self, cycle: int) -> Optional[int]:
+        """Value of register X during given `cycle`. Instead of executing
+        the program, jump to the last instruction that completed earlier.
+        Return None for cycles outside of the program.
+        """
+        ends, xs = self.boundaries()
+        if not 1 <= cycle <= (ends[-1] if ends else 0):
+            return None
+        return xs[bisect.bisect_left(ends, cycle)]
+
+    def sample(self, cycles: Iterable[int]) -> List[Optional[int]]:
+        """Values of register X during given `cycles`, see x_during()"""
+        return [self.x_during(cycle) for cycle in cycles]
+
+    def states(self, start: int = 1) -> Iterator[Tuple[int, int]]:
+        """Iterate over all cycles of the program, yielding (cycle number,
+        value of X during the cycle). Cycles are numbered from `start`."""
+        reg_x, t = 1, start
+        for ttl, val in self.instructions:
+            for _ in range(ttl):
+                yield t, reg_x
+                t += 1
+            reg_x += val
+
+    def render(self, width: int = 40, height: int = 6) -> str:
+        """Draw the CRT screen of `width` x `height` pixels. A pixel is lit
+        if the sprite (3 pixels wide, centered at X) covers it while the
+        pixel is drawn, one pixel per cycle."""
+        size = width * height
+        screen = bytearray(b"." * size)
+        pixel, reg_x = 0, 1
+        for ttl, val in self.instructions:
+            for _ in range(ttl):
+                if pixel >= size:
+                    break
+                if -1 <= pixel % width - reg_x <= 1:
+                    screen[pixel] = ord("#")
+                pixel += 1
+            if pixel >= size:
+                break
+            reg_x += val
+        return "\n".join(screen[row:row+width].decode()
+                         for row in range(0, size, width))
+
+
 def crt(instructions: List, start: int = 0) -> Generator:
     """CRT as a generator yielding at each step a 2-tuple
       * time stamp (starting at `start` or 0 by default)
       * value of Register X during the time stamp, that is, before
         corresponding instruction was executed
-
-     REMOVED (unnecessary):
-      * value of register X after the time stamp, that is once corresponding
-        instruction was executed
     """
-    reg_x = 1
-    t = start-1
-    while instructions:
-        t += 1
-        res = [t, reg_x]
-        inst = instructions.pop(0)
-        ttl, val = inst
-        ttl -= 1
-        if ttl == 0:
-            reg_x += val
-        else:
-            instructions.insert(0, (ttl, val))
-        # res.append(reg_x)
-        yield tuple(res)
+    return CPU(instructions).states(start)
 
 
 def solve_p1(instructions: List) -> int:
     """Solution to the 1st part of the challenge"""
     checkpoints = [20, 60, 100, 140, 180, 220]
-    tss = 0 # total signal strength
-    for t, reg_x in crt(instructions, 1):
-        if checkpoints[0] == t:
-            tss += t * reg_x
-            checkpoints.pop(0)
-        if not checkpoints:
-            break
-    return tss
-
-
-def solve_p2(instructions: List) -> int:
-    width, height = 40, 6
-    display = ["."] * (height*width)
+    cpu = CPU(instructions)
+    # checkpoints after the end of the program do not count
+    return sum(t * reg_x for t, reg_x in zip(checkpoints,
+                                             cpu.sample(checkpoints))
+               if reg_x is not None)
 
-    # compute state of the pixels on the display
-    for t, x in crt(instructions):
-        pos_w = t % width
-        sprite = (x-1, x, x+1)
-        if pos_w in sprite:
-            display[t] = "#"
 
-    # draw the display
-    rows = ["".join(row) for row in utils.listfold(display, width)]
-    res = "\n".join(rows)
-    return res
+def solve_p2(instructions: List) -> str:
+    """Solution to the 2nd part of the challenge"""
+    return CPU(instructions).render()
 
 
 tests = [
-    # (utils.load_input('test.0.txt', line_parser=parse), -1, None),
+    # the program ends before the first checkpoint
+    (utils.Input('test.0.txt', line_parser=parse), 0, None),
     (
-        utils.load_input('test.1.txt', line_parser=parse),
+        utils.Input('test.1.txt', line_parser=parse),
         13140,
-        utils.text_from("expected.p2.test.1.txt")
+        utils.Lazy(utils.text_from, "expected.p2.test.1.txt")
     ),
 ]
 
 
 reals = [
     (
-        utils.load_input(line_parser=parse),
+        utils.Input(line_parser=parse),
         15260,
-        utils.text_from("expected.p2.txt")  # "PGHFGLUG"
+        utils.Lazy(utils.text_from, "expected.p2.txt")  # "PGHFGLUG"
     )
 ]
 
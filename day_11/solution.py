@@ -7,7 +7,8 @@
 import re
 import os
 import sys
-from typing import List, Callable, Dict
+import math
+from typing import List, Callable, Dict, Tuple, Optional
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from aoc import utils
@@ -31,9 +32,14 @@ class Monkey(object):
         self.whom: Dict[bool, int] = {}
         self.count: int = 0
         self.human_operation: Callable = lambda x: x // 3
+        self.expression: str = "old"
 
     def parse_operation(self, arg1, op, arg2):
         # old * 5, old + old
+        for arg in (arg1, arg2):
+            if arg != "old" and not arg.isdigit():
+                raise ValueError(f"Wrong operand: {arg}")
+        self.expression = f"{arg1} {op} {arg2}"
         args = [
             (lambda x: x) if arg == "old" else lambda _: int(arg)
             for arg in [arg1, arg2]
@@ -102,7 +108,7 @@ def show(monkeys, msg = None):
         print(mky)
 
 
-def solve_p1(monkeys: List[Monkey], num_rounds: int = 20) -> int:
+def solve_p1_v1(monkeys: List[Monkey], num_rounds: int = 20) -> int:
     """Solution to the 1st part of the challenge"""
     if DEBUG:
         show(monkeys, "initial")
@@ -116,30 +122,182 @@ def solve_p1(monkeys: List[Monkey], num_rounds: int = 20) -> int:
     return monkey_business
 
 
-def solve_p2(monkeys: List[Monkey]) -> int:
+class Simulator(object):
+    """Fast simulation of monkeys throwing items to one another.
+
+    The turn of every monkey is compiled into a function specialised for
+    its operation and test, e.g. for "old * old" and divisor 23:
+
+        def turn(items, to_true, to_false):
+            for old in items:
+                new = (old * old) % 96577
+                if new % 23:
+                    to_false(new)
+                else:
+                    to_true(new)
+
+    With `relief`, worry levels are divided by 3 after inspection (part 1).
+    Otherwise, they grow without limit, therefore they are reduced modulo
+    the least common multiple of all divisors: this keeps results of all
+    tests unchanged (part 2).
+
+    Monkeys are not modified, the simulation works on copies of items.
+    """
+
+    TEMPLATE = """
+def turn(items, to_true, to_false):
+    for old in items:
+        new = {new}
+        if new % {test}:
+            to_false(new)
+        else:
+            to_true(new)
+"""
+
+    def __init__(self, monkeys: List[Monkey], relief: bool = True):
+        self.modulus = math.lcm(*(mky.test for mky in monkeys))
+        self.items = [list(mky.items) for mky in monkeys]
+        self.counts = [0] * len(monkeys)
+        self.turns = []
+        for idx, mky in enumerate(monkeys):
+            assert idx not in mky.whom.values(), (
+                f"Monkey {mky.id} throws items to itself")
+            if relief:
+                new = "({}) // 3".format(mky.expression)
+            else:
+                new = "({}) % {}".format(mky.expression, self.modulus)
+            namespace = {}
+            exec(self.TEMPLATE.format(new=new, test=mky.test), namespace)
+            self.turns.append((namespace["turn"],
+                               self.items[mky.whom[True]].append,
+                               self.items[mky.whom[False]].append))
+
+    def run(self, num_rounds: int) -> List[int]:
+        """Play given number of rounds and return the number of items
+        inspected by every monkey so far."""
+        items, counts, turns = self.items, self.counts, self.turns
+        for _ in range(num_rounds):
+            for idx, (turn, to_true, to_false) in enumerate(turns):
+                if items[idx]:
+                    counts[idx] += len(items[idx])
+                    turn(items[idx], to_true, to_false)
+                    items[idx].clear()
+        return counts
+
+
+class ItemTracer(object):
+    """Compute how many items monkeys inspect after any number of rounds
+    by following every item separately (part 2, without relief).
+
+    An item does not interact with other items: its path depends only on
+    the monkey holding it and its worry level modulo the lcm of all
+    divisors. A round takes the item from a monkey through one or more
+    inspections (while it is thrown to monkeys that have not played in
+    this round yet) to the monkey holding it at the start of the next
+    round. As there are finitely many states (monkey, worry level), the
+    sequence of states of an item at the start of every round eventually
+    repeats. The cycle is found with Brent's algorithm (utils.find_cycle),
+    after which whole cycles of rounds are counted without simulating.
+    The cost is O(items x (mu + lambda)), independently of the number of
+    rounds. When cycles are longer than the number of rounds (large lcm),
+    following items one by one does not pay off: the search is then given
+    up, see count().
+    """
+
+    def __init__(self, monkeys: List[Monkey]):
+        self.modulus = math.lcm(*(mky.test for mky in monkeys))
+        self.operations = [eval("lambda old: " + mky.expression)
+                           for mky in monkeys]
+        self.tests = [mky.test for mky in monkeys]
+        self.targets = [(mky.whom[False], mky.whom[True]) for mky in monkeys]
+        self.items = [(idx, worry % self.modulus)
+                      for idx, mky in enumerate(monkeys)
+                      for worry in mky.items]
+
+    def play_round(
+        self, state: Tuple[int, int]
+    ) -> Tuple[Tuple[int, int], List[int]]:
+        """Take an item from the `state` (monkey, worry level) at the start
+        of a round to the state at the start of the next round. Return
+        the new state and the monkeys that inspected the item."""
+        idx, worry = state
+        inspected = []
+        while True:
+            inspected.append(idx)
+            worry = self.operations[idx](worry) % self.modulus
+            target = self.targets[idx][worry % self.tests[idx] == 0]
+            if target <= idx:
+                # this monkey has already played in the current round
+                return (target, worry), inspected
+            idx = target
+
+    def next_state(self, state: Tuple[int, int]) -> Tuple[int, int]:
+        return self.play_round(state)[0]
+
+    def count(self, num_rounds: int) -> Optional[List[int]]:
+        """Number of items inspected by every monkey after `num_rounds`.
+        Return None if the cycle of some item is not found within
+        `num_rounds` rounds: playing the rounds with Simulator is faster.
+        """
+        counts = [0] * len(self.tests)
+        for state in self.items:
+            cycle = utils.find_cycle(self.next_state, state,
+                                     limit=num_rounds)
+            if cycle is None:
+                return None
+            mu, lam = cycle
+            # inspections in the rounds before the cycle and in the cycle
+            rounds = []
+            for _ in range(min(num_rounds, mu + lam)):
+                state, inspected = self.play_round(state)
+                rounds.append(inspected)
+            num_cycles, rest = 0, 0
+            if num_rounds > mu + lam:
+                num_cycles, rest = divmod(num_rounds - mu, lam)
+                num_cycles -= 1  # one cycle is in `rounds` already
+            for inspected in rounds:
+                for idx in inspected:
+                    counts[idx] += 1
+            for inspected in rounds[mu:]:
+                for idx in inspected:
+                    counts[idx] += num_cycles
+            for inspected in rounds[mu:mu+rest]:
+                for idx in inspected:
+                    counts[idx] += 1
+        return counts
+
+
+def monkey_business(counts: List[int]) -> int:
+    return utils.prod(sorted(counts)[-2:])
+
+
+def solve_p1(monkeys: List[Monkey], num_rounds: int = 20) -> int:
+    """Solution to the 1st part of the challenge"""
+    return monkey_business(Simulator(monkeys).run(num_rounds))
+
+
+def solve_p2_v1(monkeys: List[Monkey], num_rounds: int = 10000) -> int:
     """Solution to the 2nd part of the challenge"""
-    return 0
-    #solve_p1(monkeys, 1)
-    DEBUG = 1
-    num_rounds = 20
+    return monkey_business(
+        Simulator(monkeys, relief=False).run(num_rounds))
 
-    if DEBUG:
-        show(monkeys, "initial")
-    for r in range(num_rounds):
-        for mky in monkeys:
-            mky.play(monkeys)
-        if DEBUG:
-            show(monkeys, f"== After round {1+r} ==")
-    return 0
+
+def solve_p2(monkeys: List[Monkey], num_rounds: int = 10000) -> int:
+    """Solution to the 2nd part of the challenge, works for any number of
+    rounds (see ItemTracer)"""
+    counts = ItemTracer(monkeys).count(num_rounds)
+    if counts is None:
+        counts = Simulator(monkeys, relief=False).run(num_rounds)
+    return monkey_business(counts)
 
 
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 10605, 2713310158),
+    (utils.Input('test.1.txt', parser=parse), 10605, 2713310158),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), 118674, None)
+    (utils.Input(parser=parse), 118674, None)
 ]
 
 
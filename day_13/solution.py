@@ -96,12 +96,12 @@ def solve_p2(pairs: List) -> int:
 
 
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 13, 140),
+    (utils.Input('test.1.txt', parser=parse), 13, 140),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), 5882, 24948)
+    (utils.Input(parser=parse), 5882, 24948)
 ]
 
 
@@ -112,7 +112,7 @@ def solve_p2(lines: List[str]) -> int:
 
 
 tests = [
-    (utils.load_input(
+    (utils.Input(
         'test.1.txt',
         line_parser=parse_line,
         parser=parse_lines
@@ -121,7 +121,7 @@ tests = [
 
 
 reals = [
-    (utils.load_input(line_parser=parse_line, parser=parse_lines),
+    (utils.Input(line_parser=parse_line, parser=parse_lines),
         755, None)
 ]
 
@@ -7,13 +7,14 @@
 import re
 import os
 import sys
+import itertools
 from typing import List
 from collections import defaultdict
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from aoc import utils
 from aoc.utils import Point, flatten
-from aoc.geometry import BrokenLine
+from aoc.geometry import BrokenLine, IntervalSet
 
 
 DAY = '15'
@@ -57,7 +58,7 @@ def dprint(*msgs, **kwargs):
 # Therefore: 27 - 1 = 26
 
 
-def solve_p1(args) -> int:
+def solve_p1_v1(args) -> int:
     """Solution to the 1st part of the challenge"""
     sensors_and_beacons, target_y, _ = args
     # For both of the below we store only x coordinate, because y is known
@@ -101,7 +102,7 @@ def solve_p1(args) -> int:
 # 2) ignore x, y that are outside the working range [0, max_size].
 # 3) stop when first distress beacon was found.
 
-def solve_p2(args) -> int:
+def solve_p2_v1(args) -> int:
     """Solution to the 2nd part of the challenge"""
     BrokenLine.DEBUG = DEBUG
 
@@ -179,6 +180,123 @@ def mark_reachable_positions(rows, sensor, max_size):
         dprint(f"..marked y={y}: {rows[y]}")
 
 
+# Faster solutions that do not depend on the magnitude of coordinates.
+#
+# Part 1: the area reached by a sensor crosses a row in a single interval
+# of x. The number of covered positions is the total length of the union
+# of these intervals, which is computed by merging sorted intervals.
+#
+# Part 2: in rotated coordinates u = x + y and v = x - y, the area reached
+# by a sensor is a square |u - su| <= reach, |v - sv| <= reach. The distress
+# beacon is a single uncovered position, so (unless it is on the border of
+# the search area) it lies just outside the areas of several sensors: on
+# a line u = su +/- (reach+1) and on a line v = sv +/- (reach+1).
+# Typically, these are lines where the areas of two sensors are one
+# position apart, and the beacon is found at one of their intersections.
+
+def row_coverage(sensors_and_beacons, y: int) -> IntervalSet:
+    """Intervals of x reached by the sensors in the row `y`"""
+    intervals = []
+    for s, _ in sensors_and_beacons:
+        overlap = s.reach - abs(s.y - y)
+        if overlap >= 0:
+            intervals.append((s.x - overlap, s.x + overlap))
+    return IntervalSet.from_intervals(intervals)
+
+
+def solve_p1(args) -> int:
+    """Solution to the 1st part of the challenge"""
+    sensors_and_beacons, target_y, _ = args
+    covered = row_coverage(sensors_and_beacons, target_y)
+    # positions of sensors and beacons in the row are not counted
+    occupied = {pt.x for pair in sensors_and_beacons for pt in pair
+                if pt.y == target_y}
+    return len(covered) - sum(x in covered for x in occupied)
+
+
+def is_covered(sensors: List[Sensor], x: int, y: int) -> bool:
+    return any(abs(s.x - x) + abs(s.y - y) <= s.reach for s in sensors)
+
+
+def diagonal_gap(squares, c: int, lo: int, hi: int):
+    """Find a position on a diagonal line that is not reached by any
+    sensor. Sensors are given as `squares` (c0, d0, reach) in rotated
+    coordinates, the line is c = c0 and positions on it are given by d
+    within [lo, hi]. Only d of the same parity as c correspond to points
+    (x, y) with integer coordinates.
+    Return d or None, in O(S log S) for S sensors.
+    """
+    covered = IntervalSet.from_intervals(
+        (d0 - r, d0 + r) for c0, d0, r in squares if abs(c - c0) <= r)
+    for start, end in covered.gaps(lo, hi):
+        d = start + (start - c) % 2
+        if d <= end:
+            return d
+    return None
+
+
+def find_distress_beacon(sensors: List[Sensor], max_size: int):
+    """Find a position within [0, max_size] not reached by any sensor.
+    Return it as (x, y) or None if there is no such position.
+
+    Unless the whole area is free, a free position P has a neighbour that
+    is reached by some sensor, therefore P lies just outside the area of
+    that sensor. This area is a square in rotated coordinates u = x + y,
+    v = x - y. The diagonal lines u = const and v = const just outside
+    these squares are searched for a gap in the coverage one by one, in
+    O(S^2 log S) overall for S sensors. Lines between two sensors whose
+    areas are exactly one position apart are searched first.
+    """
+    if not is_covered(sensors, 0, 0):
+        return (0, 0)
+    # lines just outside the areas of the sensors, on both sides
+    us_lo, us_hi, vs_lo, vs_hi = set(), set(), set(), set()
+    squares_u, squares_v = [], []
+    for s in sensors:
+        u, v = s.x + s.y, s.x - s.y
+        us_lo.add(u - s.reach - 1)
+        us_hi.add(u + s.reach + 1)
+        vs_lo.add(v - s.reach - 1)
+        vs_hi.add(v + s.reach + 1)
+        squares_u.append((u, v, s.reach))
+        squares_v.append((v, u, s.reach))
+    us, vs = us_lo & us_hi, vs_lo & vs_hi
+    lines = itertools.chain(
+        # gaps of width 1 between two sensors
+        ((u, False) for u in sorted(us)),
+        ((v, True) for v in sorted(vs)),
+        # all other lines where the beacon can be
+        ((u, False) for u in sorted((us_lo | us_hi) - us)),
+        ((v, True) for v in sorted((vs_lo | vs_hi) - vs)),
+    )
+    size2 = 2 * max_size
+    for c, is_v in lines:
+        if is_v:
+            # 0 <= x = (u + c) / 2 <= max_size, the same for y = (u - c) / 2
+            d = diagonal_gap(squares_v, c, max(-c, c),
+                             min(size2 - c, size2 + c))
+            if d is not None:
+                return (d + c) // 2, (d - c) // 2
+        else:
+            # 0 <= x = (c + v) / 2 <= max_size, the same for y = (c - v) / 2
+            d = diagonal_gap(squares_u, c, max(-c, c - size2),
+                             min(size2 - c, c))
+            if d is not None:
+                return (c + d) // 2, (c - d) // 2
+    return None
+
+
+def solve_p2(args) -> int:
+    """Solution to the 2nd part of the challenge"""
+    sensors_and_beacons, _, max_size = args
+    sensors = [s for s, _ in sensors_and_beacons]
+    xy = find_distress_beacon(sensors, max_size)
+    dprint("Distress beacon:", xy)
+    if xy is None:
+        return 0
+    return 4000000 * xy[0] + xy[1]
+
+
 def show_rows(rows):
     dprint("--- Rows (along y axis)---")
     for y in sorted(rows.keys()):
@@ -199,13 +317,13 @@ def dshow(sensors, positions):
 
 
 tests = [
-    ((utils.load_input('test.1.txt', line_parser=parse), 10, 20), 26, 56000011),
+    ((utils.Input('test.1.txt', line_parser=parse), 10, 20), 26, 56000011),
 ]
 
 
 reals = [
     # for part 2: >= 0 and no larger than 4000000
-    ((utils.load_input(line_parser=parse), 2000000, 4000000), 4502208, 13784551204480)
+    ((utils.Input(line_parser=parse), 2000000, 4000000), 4502208, 13784551204480)
 ]
 
 
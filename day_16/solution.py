@@ -7,12 +7,17 @@
 import re
 import os
 import sys
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, Tuple
+from collections import defaultdict, deque
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from aoc import utils
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 DAY = '16'
 DEBUG = int(os.environ.get('DEBUG', 0))
 
@@ -69,6 +74,89 @@ def floyd_warshall(G: Dict[str, List[str]]):
     return distances
 
 
+# Valves with zero flow rate are only passed through, so the solvers need
+# distances between a few interesting valves only: the start and those
+# with positive flow rate. The functions below compute such distances as
+# a compact matrix, with valves mapped to indices 0..n-1 in the order of
+# `keep`. Valves that cannot be reached are at distance UNREACHABLE.
+
+# longer than any time limit (and small enough for int32 additions)
+UNREACHABLE = 10**6
+
+def index_graph(
+    G: Dict[str, List[str]]
+) -> Tuple[Dict[str, int], List[List[int]]]:
+    """Map vertices of graph `G` to indices. Return the mapping and
+    adjacency lists by index."""
+    vertices = set(G.keys())
+    vertices.update(*G.values())
+    index = {v: idx for idx, v in enumerate(sorted(vertices))}
+    adjacent = [[] for _ in index]
+    for src, trgs in G.items():
+        adjacent[index[src]] = [index[trg] for trg in trgs]
+    return index, adjacent
+
+
+def floyd_warshall_np(
+    G: Dict[str, List[str]], keep: List[str]
+) -> List[List[int]]:
+    """Shortest distances between vertices `keep` of graph `G`, by
+    Floyd-Warshall algorithm on a numpy matrix. Every step relaxes all
+    pairs (u, v) through vertex k at once."""
+    index, adjacent = index_graph(G)
+    n = len(index)
+    D = np.full((n, n), UNREACHABLE, dtype=np.int32)
+    for u, vs in enumerate(adjacent):
+        D[u, vs] = 1
+    np.fill_diagonal(D, 0)
+    for k in range(n):
+        np.minimum(D, D[:, k, None] + D[None, k, :], out=D)
+    np.minimum(D, UNREACHABLE, out=D)
+    ids = [index[v] for v in keep]
+    return D[np.ix_(ids, ids)].tolist()
+
+
+def bfs_distances(
+    G: Dict[str, List[str]], keep: List[str]
+) -> List[List[int]]:
+    """Shortest distances between vertices `keep` of graph `G`, by
+    breadth first search from each of them. This is O(K * (V + E)), which
+    beats Floyd-Warshall on sparse graphs with few interesting vertices.
+    """
+    index, adjacent = index_graph(G)
+    ids = [index[v] for v in keep]
+    matrix = []
+    for src in ids:
+        dist = [-1] * len(index)
+        dist[src] = 0
+        queue = deque([src])
+        while queue:
+            u = queue.popleft()
+            for v in adjacent[u]:
+                if dist[v] < 0:
+                    dist[v] = dist[u] + 1
+                    queue.append(v)
+        matrix.append([UNREACHABLE if dist[trg] < 0 else dist[trg]
+                       for trg in ids])
+    return matrix
+
+
+def compact_distances(
+    G: Dict[str, List[str]], keep: List[str], method: str = None
+) -> List[List[int]]:
+    """Shortest distances between vertices `keep` of graph `G` computed by
+    given `method`: "numpy" (Floyd-Warshall) or "bfs". By default, BFS is
+    used: valve graphs are sparse and only few valves are of interest."""
+    method = method or "bfs"
+    if method == "numpy":
+        if np is None:
+            raise ValueError("Method 'numpy' requires numpy")
+        return floyd_warshall_np(G, keep)
+    if method == "bfs":
+        return bfs_distances(G, keep)
+    raise ValueError(f"Unknown method: {method}")
+
+
 def solve_p1_rec(
     start: str,
     available_time: int,
@@ -115,33 +203,169 @@ def solve_p1_rec(
     return best
 
 
-def solve_p1(args) -> int:
+def solve_p1_v1(args) -> int:
     """Solution to the 1st part of the challenge"""
-    rooms, valves = args
+    (rooms, valves), time, _ = args
     show(rooms, valves)
     distances = floyd_warshall(rooms)
-    released_pressure = solve_p1_rec("AA", 30, distances, valves)
+    released_pressure = solve_p1_rec("AA", time, distances, valves)
     return released_pressure
 
 
+class ValveSolver(object):
+    """Find the order of opening valves that releases the most pressure.
+
+    Only valves with positive flow rate that can be reached from the start
+    are considered. They are numbered
+    0..n-1 and a set of opened valves is a bitmask. Moving to a valve and
+    opening it costs distance+1 minutes, after which the valve releases
+    its flow rate for every remaining minute.
+
+    Two approaches are available:
+    * best_per_subset() -- explores all states (position, time left,
+      opened valves) and finds the best pressure for every set of opened
+      valves. This is needed when work is shared, see max_pressure_pair().
+    * max_pressure() -- depth first search with branch and bound: a branch
+      is abandoned if even its upper bound is below the best pressure
+      found so far.
+    """
+
+    def __init__(
+        self, rooms, valves, start: str = "AA", method: str = None
+    ):
+        names = [v for v in sorted(valves) if valves[v] > 0]
+        # start is the last one
+        distances = compact_distances(rooms, names + [start], method)
+        reachable = [idx for idx, d in enumerate(distances[-1][:-1])
+                     if d < UNREACHABLE]
+        reachable.append(len(names))
+        distances = [[distances[u][v] for v in reachable] for u in reachable]
+        self.names = [names[idx] for idx in reachable[:-1]]
+        self.rates = [valves[v] for v in self.names]
+        # time to go to a valve and open it, from the start and between valves
+        self.start_costs = [d + 1 for d in distances[-1][:-1]]
+        self.costs = [[d + 1 for d in row[:-1]] for row in distances[:-1]]
+        # used to estimate upper bounds: the cheapest step of all, including
+        # the first one from the start
+        self.min_cost = min(
+            self.start_costs + [c for row in self.costs for c in row if c > 1]
+            or [2])
+        self.by_rate = sorted(range(len(self.names)),
+                              key=lambda v: self.rates[v], reverse=True)
+
+    def _costs_from(self, pos: int) -> List[int]:
+        return self.start_costs if pos < 0 else self.costs[pos]
+
+    def best_per_subset(self, time: int) -> Dict[int, int]:
+        """Return {opened valves (bitmask): max pressure released} for all
+        sets of valves that can be opened within `time` minutes.
+        """
+        n = len(self.names)
+        best = {0: 0}
+        # (position, time left, opened valves) -> best pressure so far.
+        # A state reached again with no more pressure is not explored.
+        seen = {}
+        stack = [(-1, time, 0, 0)]  # position -1 is the start
+        while stack:
+            pos, left, opened, pressure = stack.pop()
+            costs = self._costs_from(pos)
+            for nxt in range(n):
+                bit = 1 << nxt
+                remains = left - costs[nxt]
+                if opened & bit or remains <= 0:
+                    continue
+                state = (nxt, remains, opened | bit)
+                value = pressure + remains * self.rates[nxt]
+                if seen.get(state, -1) >= value:
+                    continue
+                seen[state] = value
+                if best.get(opened | bit, -1) < value:
+                    best[opened | bit] = value
+                stack.append((nxt, remains, opened | bit, value))
+        return best
+
+    def upper_bound(self, left: int, opened: int) -> int:
+        """Estimate how much more pressure can be released in `left`
+        minutes at most: as if the valves not yet opened were reached
+        one after another, the best ones first, in the shortest time."""
+        bound = 0
+        for v in self.by_rate:
+            if not opened & (1 << v):
+                left -= self.min_cost
+                if left <= 0:
+                    break
+                bound += left * self.rates[v]
+        return bound
+
+    def max_pressure(self, time: int) -> int:
+        """Max pressure that can be released in `time` minutes"""
+        n = len(self.names)
+        best = 0
+
+        def explore(pos: int, left: int, opened: int, pressure: int):
+            nonlocal best
+            best = max(best, pressure)
+            if pressure + self.upper_bound(left, opened) < best:
+                return
+            costs = self._costs_from(pos)
+            for nxt in range(n):
+                remains = left - costs[nxt]
+                if not opened & (1 << nxt) and remains > 0:
+                    explore(nxt, remains, opened | (1 << nxt),
+                            pressure + remains * self.rates[nxt])
+
+        explore(-1, time, 0, 0)
+        return best
+
+    def max_pressure_pair(self, time: int) -> int:
+        """Max pressure that two workers (you and an elephant) can release
+        in `time` minutes, each of them opening a different set of valves.
+        """
+        best = self.best_per_subset(time)
+        # best combination of two disjoint sets of valves. With sets sorted
+        # by pressure, the search stops once no pair can beat the result.
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        result = 0
+        for idx, (mask1, value1) in enumerate(ranked):
+            if 2 * value1 <= result:
+                break
+            for mask2, value2 in ranked[idx:]:
+                if value1 + value2 <= result:
+                    break
+                if not mask1 & mask2:
+                    result = value1 + value2
+                    break
+        return result
+
+
+def solve_p1(args) -> int:
+    """Solution to the 1st part of the challenge"""
+    (rooms, valves), time, _ = args
+    show(rooms, valves)
+    return ValveSolver(rooms, valves).max_pressure(time)
+
+
 def solve_p2(args) -> int:
     """Solution to the 2nd part of the challenge"""
-    rooms, valves = args
-    distances = floyd_warshall(rooms)
-    released_pressure = solve_p1_rec("AA", 26, distances, valves)
-    return released_pressure
+    (rooms, valves), _, time = args
+    return ValveSolver(rooms, valves).max_pressure_pair(time)
 
 
+# input, minutes available in part 1 and in part 2
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 1651, 1707),
+    ((utils.Input('test.1.txt', parser=parse), 30, 26), 1651, 1707),
+    # valve CC can not be reached
+    ((utils.Input('test.2.txt', parser=parse), 30, 26), 364, 312),
+    # the first step is cheaper than any step between valves
+    ((utils.Input('test.3.txt', parser=parse), 3, 3), 10, 20),
 ]
 
 
 reals = [
-    # (utils.load_input(parser=parse), 1559, None)
+    ((utils.Input(parser=parse), 30, 26), 1559, None)
 ]
 
 
 if __name__ == '__main__':
     utils.run_tests(DAY, tests, solve_p1, solve_p2)
-    # utils.run_real(DAY, reals, solve_p1, solve_p2)
+    utils.run_real(DAY, reals, solve_p1, solve_p2)
@@ -1,12 +1,12 @@
 #!/usr/bin/env python
 
 # # #
-# TODO:
-# 1. solve_p1() runs pretty long. how to improve?
+#
+#
 
 import os
 import sys
-from typing import List, Union, Iterable
+from typing import List, Union, Iterable, Optional
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 from aoc import utils
@@ -153,7 +153,7 @@ def move_a_rock(rock, jet, floor):
     floor += rock
 
 
-def solve_p1(jet: Jet, num_rocks: int = 2022) -> int:
+def solve_p1_v1(jet: Jet, num_rocks: int = 2022) -> int:
     """Solution to the 1st part of the challenge"""
     # num_rocks = 11 # debug
     Rock.reset()
@@ -175,22 +175,220 @@ def solve_p1(jet: Jet, num_rocks: int = 2022) -> int:
     return floor.height() - 1 # excluding the hight of the initial floor
 
 
-def solve_p2(lines: List[str]) -> int:
+# The chamber as a tower of rows, every row is a 7-bit mask of occupied
+# cells: bit 6 is the leftmost column, bit 0 the rightmost one. A rock is
+# a tuple of such masks, bottom row first, positioned 2 units away from
+# the left wall. A jet shifts all masks of the rock by one bit and a rock
+# collides with the tower if any of its masks ANDed with the row it is at
+# is nonzero.
+
+WIDTH = 7
+LEFT_WALL = 1 << (WIDTH - 1)
+RIGHT_WALL = 1
+FULL_ROW = (1 << WIDTH) - 1
+
+ROCKS = (
+    (0b0011110,),                               # minus
+    (0b0001000, 0b0011100, 0b0001000),          # plus
+    (0b0011100, 0b0000100, 0b0000100),          # angle
+    (0b0010000,) * 4,                           # vbar
+    (0b0011000,) * 2,                           # square
+)
+
+
+def placements(rock: tuple) -> List[tuple]:
+    """All horizontal positions of `rock`, from the left wall to the right
+    one. A rock appears 2 units away from the left wall, at index 2."""
+    while not any(mask & LEFT_WALL for mask in rock):
+        rock = tuple(mask << 1 for mask in rock)
+    positions = [rock]
+    while not any(mask & RIGHT_WALL for mask in rock):
+        rock = tuple(mask >> 1 for mask in rock)
+        positions.append(rock)
+    return positions
+
+
+PLACEMENTS = [placements(rock) for rock in ROCKS]
+
+
+class Tower(object):
+    """Chamber where rocks fall one after another in the order of ROCKS
+    while being pushed by jets.
+
+    Rows of the chamber are stored bottom first, so that the row at
+    height y (counting from 0 above the floor) is rows[y - base].
+
+    Rows below the reachable surface (see surface()) can never be touched
+    by a rock again. Once the tower has grown by `max_rows`, such rows are
+    dropped and `base` grows accordingly. This keeps the memory and the
+    cost of a drop constant however many rocks have fallen.
+    """
+
+    def __init__(self, pattern: Iterable[str], max_rows: int = 256):
+        self.jets = [-1 if action == "<" else +1 for action in pattern]
+        self.rows: List[int] = []
+        self.base = 0  # number of rows dropped
+        self.max_rows = max_rows
+        self._trim_at = max_rows
+        self.jet_idx = 0
+        self.rock_idx = 0
+        self.num_rocks = 0
+
+    @property
+    def height(self) -> int:
+        return self.base + len(self.rows)
+
+    def drop(self):
+        """Let the next rock fall until it comes to rest"""
+        positions = PLACEMENTS[self.rock_idx]
+        self.rock_idx = (self.rock_idx + 1) % len(ROCKS)
+        self.num_rocks += 1
+        jets, num_jets, jet_idx = self.jets, len(self.jets), self.jet_idx
+        rows = self.rows
+        max_x = len(positions) - 1
+
+        def collides(rock: tuple, y: int) -> bool:
+            for mask in rock:
+                if y < len(rows) and rows[y] & mask:
+                    return True
+                y += 1
+            return False
+
+        # The rock appears 3 rows above the tower: the first 4 jets push
+        # it while it is still above the tower, only walls can stop it.
+        x = 2
+        for _ in range(4):
+            x = min(max(x + jets[jet_idx], 0), max_x)
+            jet_idx = (jet_idx + 1) % num_jets
+        y = len(rows)
+        rock = positions[x]
+        while y > 0 and not collides(rock, y - 1):
+            y -= 1
+            nx = x + jets[jet_idx]
+            jet_idx = (jet_idx + 1) % num_jets
+            if 0 <= nx <= max_x and not collides(positions[nx], y):
+                x, rock = nx, positions[nx]
+        self.jet_idx = jet_idx
+
+        # the rock comes to rest
+        for mask in rock:
+            if y < len(rows):
+                rows[y] |= mask
+            else:
+                rows.append(mask)
+            y += 1
+        if len(rows) >= self._trim_at:
+            self.trim()
+
+    def trim(self):
+        """Drop the rows that no rock can reach anymore"""
+        surface = self.surface(window=len(self.rows))
+        if surface is not None:
+            cut = len(self.rows) - len(surface)
+            del self.rows[:cut]
+            self.base += cut
+        self._trim_at = len(self.rows) + self.max_rows
+
+    def surface(self, window: int = 64) -> Optional[tuple]:
+        """Profile of the surface of the tower: the empty cells that can
+        still be reached by a falling rock, as a mask per row from the top
+        down. Rocks move down, left and right but never up, so a cell is
+        reachable if it is empty and next to a reachable cell in the same
+        row or right below a reachable cell.
+
+        Returns None if the reachable cells do not end within `window`
+        rows from the top or reach the floor.
+        """
+        rows = self.rows
+        reach = FULL_ROW
+        profile = []
+        lowest = max(len(rows) - window, 0)
+        for y in range(len(rows) - 1, lowest - 1, -1):
+            empty = ~rows[y] & FULL_ROW
+            reach &= empty
+            while True:
+                spread = reach | (reach << 1 | reach >> 1) & empty
+                if spread == reach:
+                    break
+                reach = spread
+            if not reach:
+                return tuple(profile)
+            profile.append(reach)
+        if lowest == 0 and self.base:
+            # rows below were dropped because they are unreachable
+            return tuple(profile)
+        return None
+
+    def state(self) -> Optional[tuple]:
+        """Everything that determines how the tower will grow further, or
+        None if it is not known (see surface())."""
+        surface = self.surface()
+        if surface is None:
+            return None
+        return (self.rock_idx, self.jet_idx, surface)
+
+    def height_after(self, num_rocks: int) -> int:
+        """Compute the height of the tower after `num_rocks` rocks fell.
+
+        The sequences of rocks and jets are periodic, and so eventually is
+        the growth of the tower: once the state (next rock, next jet,
+        surface) repeats, every following period adds the same number of
+        rocks and the same height. Whole periods are not simulated.
+        """
+        heights = [self.height]  # after 0, 1, 2, ... rocks
+        seen = {}
+        while self.num_rocks < num_rocks:
+            self.drop()
+            heights.append(self.height)
+            state = self.state()
+            if state is None:
+                continue
+            if state in seen:
+                start = seen[state]
+                period = self.num_rocks - start
+                growth = self.height - heights[start]
+                num_periods, rest = divmod(num_rocks - start, period)
+                dprint(f"Period of {period} rocks after {start} rocks, "
+                       f"the tower grows by {growth}")
+                return heights[start + rest] + num_periods * growth
+            seen[state] = self.num_rocks
+        return self.height
+
+    def __str__(self):
+        lines = [
+            "|" + format(row, f"0{WIDTH}b").replace("0", ".").replace("1", "#")
+            + "|" for row in reversed(self.rows)
+        ]
+        # the floor or the rows that were dropped
+        if self.base:
+            lines.append("~" * (WIDTH + 2))
+        else:
+            lines.append("+" + "-" * WIDTH + "+")
+        return "\n".join(lines)
+
+
+def solve_p1(jet: Jet, num_rocks: int = 2022) -> int:
+    """Solution to the 1st part of the challenge"""
+    tower = Tower(jet.steps)
+    for _ in range(num_rocks):
+        tower.drop()
+    if DEBUG:
+        print(tower)
+    return tower.height
+
+
+def solve_p2(jet: Jet, num_rocks: int = 1_000_000_000_000) -> int:
     """Solution to the 2nd part of the challenge"""
-    # TODO
-    # after 1_000_000_000_000 rocks fell
-    # filling of the chamber repeats. find out repetition period and
-    # skip as many simulations as possible
-    return 0
+    return Tower(jet.steps).height_after(num_rocks)
 
 
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 3068, 1514285714288),
+    (utils.Input('test.1.txt', parser=parse), 3068, 1514285714288),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), 3232, None)
+    (utils.Input(parser=parse), 3232, None)
 ]
 
 
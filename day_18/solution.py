@@ -112,12 +112,12 @@ def solve_p2(cubes: List[Point]) -> int:
 
 
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 64, 58),
+    (utils.Input('test.1.txt', parser=parse), 64, 58),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), 3470, 1986)
+    (utils.Input(parser=parse), 3470, 1986)
 ]
 
 
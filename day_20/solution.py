@@ -7,7 +7,8 @@
 import re
 import os
 import sys
-from typing import List
+import math
+from typing import List, Tuple
 from collections import deque
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -34,19 +35,20 @@ class N(object):
         return "({}, #{})".format(self.value, self.position)
 
 
-def parse(lines: List[str]) -> str:
+def parse(lines: List[str]) -> List[int]:
     """Parse a line of input into suitable data structure:"""
-    numbers = [N(ln, idx) for idx, ln in enumerate(lines)]
+    return [int(ln) for ln in lines]
+
+
+def to_nodes(values: List[int]) -> deque:
+    """Make linked elements N for the mixing by rotation of a deque"""
+    numbers = [N(value, idx) for idx, value in enumerate(values)]
+    link(numbers)
     return deque(numbers)
 
 
 def link(numbers: List[N]):
-    """Link every element to its following element.
-
-    Ideally, this should be done inside parse(). However, it causes
-        RecursionError: maximum recursion depth exceeded
-    that comes from utils.run_real() deepcopy(). TODO: fix
-    """
+    """Link every element to its following element."""
     for i in range(1, len(numbers)):
         numbers[i-1].next = numbers[i]
 
@@ -94,20 +96,20 @@ def compute_groove_coordinates(numbers: List[N]) -> int:
     return res
 
 
-def solve_p1(numbers: List[N]) -> int:
+def solve_p1_v1(values: List[int]) -> int:
     """Solution to the 1st part of the challenge"""
-    link(numbers)
+    numbers = to_nodes(values)
     mix(numbers)
 
     return compute_groove_coordinates(numbers)
 
 
-def solve_p2(numbers: List[N]) -> int:
+def solve_p2_v1(values: List[int]) -> int:
     """Solution to the 2nd part of the challenge"""
+    numbers = to_nodes(values)
 
     for i in range(len(numbers)):
         numbers[i].value *= 811589153
-    link(numbers)
 
     first = numbers[0]
     for _ in range(10):
@@ -119,13 +121,138 @@ def solve_p2(numbers: List[N]) -> int:
     return compute_groove_coordinates(numbers)
 
 
+class Mixer(object):
+    """Circular list of numbers that supports moving an element by its
+    value in O(sqrt(n)).
+
+    Elements are referred to by their original index 0..n-1. Their current
+    order is kept in blocks of about sqrt(n) elements (sqrt decomposition):
+    an element is found via the block it belongs to, and moving it changes
+    two blocks only. Blocks are rebuilt once one of them grows twice as
+    large as `block_size`. Sizes of blocks are kept in a Fenwick tree, so
+    that the number of elements before a block and the block at a given
+    position are found in O(log n).
+
+    Moving an element by its value in a circle of n elements is the same as
+    moving it by the value modulo n-1 (the element itself is not counted),
+    so even huge values cost nothing extra.
+    """
+
+    def __init__(self, values: List[int], block_size: int = None):
+        self.values = list(values)
+        n = len(self.values)
+        self.shifts = [v % (n - 1) if n > 1 else 0 for v in self.values]
+        self.block_size = block_size or max(16, math.isqrt(n))
+        self._build(list(range(n)))
+
+    def _build(self, order: List[int]):
+        size = self.block_size
+        self.blocks = [order[i:i+size] for i in range(0, len(order), size)]
+        self.block_of = [0] * len(order)
+        for bidx, block in enumerate(self.blocks):
+            for idx in block:
+                self.block_of[idx] = bidx
+        # Fenwick tree of block sizes, 1-based
+        self.tree = [0] + [len(block) for block in self.blocks]
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def _resize(self, bidx: int, delta: int):
+        """Change the size of the block `bidx` by `delta` in the tree"""
+        tree, i = self.tree, bidx + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _count_before(self, bidx: int) -> int:
+        """Number of elements in the blocks before the block `bidx`"""
+        tree, i, total = self.tree, bidx, 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _find(self, pos: int) -> Tuple[int, int]:
+        """Find where to insert an element at position `pos`: return the
+        block and the offset within the block."""
+        tree, bidx = self.tree, 0
+        step = 1 << (len(tree).bit_length() - 1)
+        while step:
+            # find the last block that starts before `pos`
+            nxt = bidx + step
+            if nxt < len(tree) and tree[nxt] < pos:
+                bidx = nxt
+                pos -= tree[nxt]
+            step >>= 1
+        return bidx, pos
+
+    def order(self) -> List[int]:
+        """Original indices of elements in their current order"""
+        return [idx for block in self.blocks for idx in block]
+
+    def move(self, idx: int):
+        """Move the element `idx` forward by its value"""
+        shift = self.shifts[idx]
+        if not shift:
+            return
+        blocks = self.blocks
+        bidx = self.block_of[idx]
+        block = blocks[bidx]
+        offset = block.index(idx)
+        pos = offset + self._count_before(bidx)
+        del block[offset]
+        self._resize(bidx, -1)
+
+        pos = (pos + shift) % (len(self.values) - 1)
+        bidx, offset = self._find(pos)
+        block = blocks[bidx]
+        block.insert(offset, idx)
+        self._resize(bidx, +1)
+        self.block_of[idx] = bidx
+
+        if len(block) > 2 * self.block_size:
+            self._build(self.order())
+
+    def mix(self, times: int = 1):
+        """Move all elements, in their original order, `times` times"""
+        for _ in range(times):
+            for idx in range(len(self.values)):
+                self.move(idx)
+
+    def mixed(self) -> List[int]:
+        """Values in their current order"""
+        return [self.values[idx] for idx in self.order()]
+
+
+def groove_coordinates(numbers: List[int]) -> int:
+    """Sum of 1000th, 2000th and 3000th numbers after 0"""
+    zero = numbers.index(0)
+    return sum(numbers[(zero + k) % len(numbers)] for k in (1000, 2000, 3000))
+
+
+def solve_p1(values: List[int]) -> int:
+    """Solution to the 1st part of the challenge"""
+    mixer = Mixer(values)
+    mixer.mix()
+    return groove_coordinates(mixer.mixed())
+
+
+def solve_p2(values: List[int]) -> int:
+    """Solution to the 2nd part of the challenge"""
+    mixer = Mixer([v * 811589153 for v in values])
+    mixer.mix(10)
+    return groove_coordinates(mixer.mixed())
+
+
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 3, 1623178306),
+    (utils.Input('test.1.txt', parser=parse), 3, 1623178306),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), 11123, 4248669215955)
+    (utils.Input(parser=parse), 11123, 4248669215955)
 ]
 
 
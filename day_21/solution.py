@@ -6,6 +6,8 @@
 
 import os
 import sys
+import operator
+from fractions import Fraction
 from typing import List, Dict, Union
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -132,11 +134,169 @@ def parse(lines: List[str]) -> str:
     return Stree.from_text(lines)
 
 
-def solve_p1(expr: Stree) -> int:
+def solve_p1_v1(expr: Stree) -> int:
     """Solution to the 1st part of the challenge"""
     return expr["root"].eval()
 
 
+class Program(object):
+    """Monkey expressions compiled into a flat list of instructions.
+
+    Variables are sorted topologically, so that every variable comes after
+    the operands it depends on, and are referred to by their index in this
+    order. Instruction i is either (None, value, None) for a number or
+    (operator, index of 1st operand, index of 2nd operand). All values are
+    then computed in one pass, without recursion, into the list `values`.
+
+    The program also keeps the reverse index of operands: `users[i]` are
+    the instructions that use variable i. When a single number changes
+    (see set()), only the variables that depend on it are recomputed.
+    """
+
+    OPERATORS = {
+        "+": operator.add,
+        "-": operator.sub,
+        "*": operator.mul,
+        "/": operator.floordiv,
+    }
+
+    def __init__(self, tree: Stree):
+        self.names = self.sort(tree)
+        self.index = {name: idx for idx, name in enumerate(self.names)}
+        self.code = []
+        self.users = [[] for _ in self.names]
+        for idx, name in enumerate(self.names):
+            rhs = tree[name]
+            if isinstance(rhs, Stree.Value):
+                self.code.append((None, rhs.value, None))
+            else:
+                op1, op2 = (self.index[op] for op in rhs.operands)
+                self.code.append((rhs.operator, op1, op2))
+                self.users[op1].append(idx)
+                if op2 != op1:
+                    self.users[op2].append(idx)
+        self.values = [0] * len(self.names)
+        self.evaluate()
+
+    @staticmethod
+    def sort(tree: Stree) -> List[str]:
+        """Sort variables of the `tree` topologically (operands first) by
+        iterative depth first search."""
+        order, done = [], set()
+        for start in tree.variables:
+            if start in done:
+                continue
+            stack = [(start, False)]
+            while stack:
+                name, expanded = stack.pop()
+                if expanded:
+                    order.append(name)
+                    continue
+                if name in done:
+                    continue
+                done.add(name)
+                stack.append((name, True))
+                rhs = tree[name]
+                if isinstance(rhs, Stree.Expression):
+                    for op in reversed(rhs.operands):
+                        if op not in done:
+                            stack.append((op, False))
+        return order
+
+    def _compute(self, idx: int):
+        op, arg1, arg2 = self.code[idx]
+        if op is None:
+            self.values[idx] = arg1
+        else:
+            self.values[idx] = self.OPERATORS[op](self.values[arg1],
+                                                  self.values[arg2])
+
+    def evaluate(self) -> List[int]:
+        """Compute values of all variables"""
+        for idx in range(len(self.code)):
+            self._compute(idx)
+        return self.values
+
+    def __getitem__(self, name: str) -> int:
+        return self.values[self.index[name]]
+
+    def set(self, name: str, value: int):
+        """Change the number of the variable `name` and recompute only the
+        variables that depend on it"""
+        start = self.index[name]
+        op, _, _ = self.code[start]
+        assert op is None, f"Variable {name} is not a number"
+        self.code[start] = (None, value, None)
+        # all variables that depend on `name`, recomputed in topological
+        # order (that is, by index)
+        affected, stack = {start}, [start]
+        while stack:
+            for user in self.users[stack.pop()]:
+                if user not in affected:
+                    affected.add(user)
+                    stack.append(user)
+        for idx in sorted(affected):
+            self._compute(idx)
+
+    def solve(self, unknown: str = "humn", equation: str = "root") -> int:
+        """Find the number of the variable `unknown` such that both operands
+        of the variable `equation` are equal.
+
+        The unknown x is propagated through the variables that depend on it
+        (found with the reverse index of operands) in a single pass, as an
+        exact linear form a*x + b with rational a, b. Division is exact
+        here, unlike in evaluate(). Raises ValueError if an operand is not
+        linear in x or if the equation does not have exactly one integer
+        solution.
+        """
+        start = self.index[unknown]
+        affected, stack = {start}, [start]
+        while stack:
+            for user in self.users[stack.pop()]:
+                if user not in affected:
+                    affected.add(user)
+                    stack.append(user)
+
+        # variable index -> (a, b), only for variables depending on x
+        forms = {start: (Fraction(1), Fraction(0))}
+
+        def form(idx):
+            return forms.get(idx, (Fraction(0), Fraction(self.values[idx])))
+
+        eq = self.index[equation]
+        for idx in sorted(affected - {start, eq}):
+            op, arg1, arg2 = self.code[idx]
+            (a1, b1), (a2, b2) = form(arg1), form(arg2)
+            if op == "+":
+                forms[idx] = (a1 + a2, b1 + b2)
+            elif op == "-":
+                forms[idx] = (a1 - a2, b1 - b2)
+            elif op == "*" and not (a1 and a2):
+                forms[idx] = (a1 * b2 + a2 * b1, b1 * b2)
+            elif op == "/" and not a2 and b2:
+                forms[idx] = (a1 / b2, b1 / b2)
+            else:
+                raise ValueError("Variable {} = {} {} {} is not linear in "
+                                 "{}".format(self.names[idx],
+                                             self.names[arg1], op,
+                                             self.names[arg2], unknown))
+
+        _, arg1, arg2 = self.code[eq]
+        (a1, b1), (a2, b2) = form(arg1), form(arg2)
+        if a1 == a2:
+            raise ValueError(f"Equation {equation} does not depend on "
+                             f"{unknown}")
+        x = (b2 - b1) / (a1 - a2)
+        if x.denominator != 1:
+            raise ValueError(f"Solution {unknown} = {x} is not an integer")
+        return int(x)
+
+
+def solve_p1(tree: Stree) -> int:
+    """Solution to the 1st part of the challenge"""
+    return Program(tree)["root"]
+
+
 def transform(tree, operand):
     """Extract `operand` to be root of the tree"""
     expr = tree.find(operand)
@@ -148,7 +308,7 @@ def transform(tree, operand):
     tree[trn.target] = trn
 
 
-def solve_p2(tree: Stree) -> int:
+def solve_p2_v1(tree: Stree) -> int:
     """Solution to the 2nd part of the challenge"""
     tree["root"].operator = "="
     target = "humn"
@@ -156,13 +316,18 @@ def solve_p2(tree: Stree) -> int:
     return tree[target].eval()
 
 
+def solve_p2(tree: Stree) -> int:
+    """Solution to the 2nd part of the challenge"""
+    return Program(tree).solve("humn", "root")
+
+
 tests = [
-    (utils.load_input('test.1.txt', parser=parse), 152, 301),
+    (utils.Input('test.1.txt', parser=parse), 152, 301),
 ]
 
 
 reals = [
-    (utils.load_input(parser=parse), 142707821472432, 3587647562851)
+    (utils.Input(parser=parse), 142707821472432, 3587647562851)
 ]
 
 
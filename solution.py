@@ -36,13 +36,13 @@ def solve_p2(lines: List[str]) -> int:
 
 
 tests = [
-    # (utils.load_input('test.1.txt', line_parser=parse), exp1, None),
+    # (utils.Input('test.1.txt', line_parser=parse), exp1, None),
     # TODO
 ]
 
 
 reals = [
-    # (utils.load_input(line_parser=parse), None, None)
+    # (utils.Input(line_parser=parse), None, None)
 ]
 
 